@@ -0,0 +1,183 @@
+from datetime import datetime
+from threading import Lock, get_ident
+from typing import Callable, Dict, Optional, Tuple
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+# From Python 3.12 cProfile runs on the process-wide sys.monitoring: only one
+# Profile can be enabled at a time in the whole process, and it sees every
+# thread. Messages are then profiled one at a time per process, and messages
+# that arrive while another is being profiled run unprofiled (counted as
+# "skipped").
+PROCESS_WIDE_PROFILING = sys.version_info >= (3, 12)
+_monitoring_lock = Lock()
+
+
+class AgentProfiler:
+    """cProfile and tracemalloc sampling scoped to one agent's handle_message calls.
+
+    Driven at runtime by CONTROL messages; see BaseAgent._handle_control.
+    One profiler is shared by every worker of an agent id, so a single
+    control message toggles or dumps the whole worker pool. Each worker
+    thread records into its own cProfile.Profile, and dumps merge them.
+    Stopping keeps the collected stats until they are dumped or reset.
+    Per-message memory figures are deltas of the process-wide tracemalloc
+    counters, and dumped snapshots cover the whole process.
+    """
+
+    ACTIONS = (
+        "profile_start", "profile_stop", "profile_dump", "profile_reset",
+        "tracemalloc_start", "tracemalloc_stop", "tracemalloc_dump",
+    )
+
+    def __init__(self, agent_id: str, output_dir: str = "profiles"):
+        self.agent_id = agent_id
+        self.output_dir = output_dir
+        self.profiling = False
+        self.tracing = False
+        self.skipped = 0
+        self._started_tracemalloc = False
+        # Thread ident (0 for the single process-wide profile) -> (lock held while enabled, profile)
+        self._profiles: Dict[int, Tuple[Lock, cProfile.Profile]] = {}
+        self._lock = Lock()
+        self.memory_stats = {"messages": 0, "net_bytes": 0, "peak_bytes": 0, "seconds": 0.0}
+
+    @property
+    def active(self) -> bool:
+        return self.profiling or self.tracing
+
+    def run(self, handler: Callable, message):
+        """Call handler(message) with the enabled samplers attached."""
+        tracing = self.tracing
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        slot = self._enable() if self.profiling else None
+        start = time.perf_counter()
+        try:
+            handler(message)
+        finally:
+            if slot is not None:
+                self._disable(slot)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                with self._lock:
+                    self.memory_stats["messages"] += 1
+                    self.memory_stats["net_bytes"] += current - before
+                    self.memory_stats["peak_bytes"] = max(self.memory_stats["peak_bytes"], peak - before)
+                    self.memory_stats["seconds"] += time.perf_counter() - start
+
+    def _enable(self) -> Optional[Tuple[Lock, cProfile.Profile]]:
+        """Enable this thread's profile; None when the message has to run unprofiled."""
+        if PROCESS_WIDE_PROFILING and not _monitoring_lock.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return None
+        key = 0 if PROCESS_WIDE_PROFILING else get_ident()
+        with self._lock:
+            slot = self._profiles.get(key)
+            if slot is None:
+                slot = self._profiles[key] = (Lock(), cProfile.Profile())
+        slot[0].acquire()
+        try:
+            slot[1].enable()
+        except ValueError:
+            # Another tool (e.g. a debugger) owns sys.monitoring
+            slot[0].release()
+            if PROCESS_WIDE_PROFILING:
+                _monitoring_lock.release()
+            with self._lock:
+                self.skipped += 1
+            return None
+        return slot
+
+    def _disable(self, slot: Tuple[Lock, cProfile.Profile]):
+        slot[1].disable()
+        slot[0].release()
+        if PROCESS_WIDE_PROFILING:
+            _monitoring_lock.release()
+
+    def _collected_stats(self) -> Optional[pstats.Stats]:
+        """Merged stats of every worker's profile, or None before anything was profiled."""
+        with self._lock:
+            slots = list(self._profiles.values())
+        merged = None
+        for lock, profile in slots:
+            # A profile must not be enabled while its stats are snapshotted
+            with lock:
+                stats = pstats.Stats(profile)
+            if merged is None:
+                merged = stats
+            else:
+                merged.add(stats)
+        return merged
+
+    def handle(self, action: str, params: dict) -> dict:
+        """Apply a control action and return a result summary."""
+        if action == "profile_start":
+            self.profiling = True
+            return {"profiling": True}
+
+        if action == "profile_stop":
+            self.profiling = False
+            return {"profiling": False, "collected": bool(self._profiles), "skipped": self.skipped}
+
+        if action == "profile_reset":
+            with self._lock:
+                self._profiles = {}
+                self.skipped = 0
+            return {"profiling": self.profiling}
+
+        if action == "profile_dump":
+            stats = self._collected_stats()
+            if stats is None:
+                raise ValueError("No profile collected; send profile_start first")
+            path = params.get("path") or self._default_path("prof", params)
+            stats.dump_stats(path)
+            summary_path = path + ".txt"
+            with open(summary_path, "w", encoding="utf-8") as f:
+                pstats.Stats(path, stream=f).sort_stats("cumulative").print_stats(params.get("limit", 30))
+            result = {"path": path, "summary": summary_path, "skipped": self.skipped}
+            # A stopped profile has been handed over; a running one keeps accumulating unless reset
+            if params.get("reset") or not self.profiling:
+                self.handle("profile_reset", params)
+            return result
+
+        if action == "tracemalloc_start":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(params.get("frames", 10))
+                self._started_tracemalloc = True
+            self.tracing = True
+            return {"tracing": True}
+
+        if action == "tracemalloc_stop":
+            self.tracing = False
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            return {"tracing": False, "memory_stats": dict(self.memory_stats)}
+
+        if action == "tracemalloc_dump":
+            if not tracemalloc.is_tracing():
+                raise ValueError("tracemalloc is not running")
+            path = params.get("path") or self._default_path("tracemalloc", params)
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(path)
+            summary_path = path + ".txt"
+            with open(summary_path, "w", encoding="utf-8") as f:
+                f.write(f"{self.agent_id} handle_message memory: {self.memory_stats}\n\n")
+                for stat in snapshot.statistics("lineno")[:params.get("limit", 30)]:
+                    f.write(f"{stat}\n")
+            return {"path": path, "summary": summary_path, "memory_stats": dict(self.memory_stats)}
+
+        raise ValueError(f"Unknown control action: {action}")
+
+    def _default_path(self, extension: str, params: dict) -> str:
+        output_dir = params.get("output_dir", self.output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return os.path.join(output_dir, f"{self.agent_id}-{stamp}.{extension}")
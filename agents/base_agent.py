@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from threading import Thread, Event
-from messaging.message_types import Message, MessageType
+from messaging.message_types import Message, MessageType, MessagePriority
 from messaging.message_bus import MessageBus
+from agents.agent_profiler import AgentProfiler
 from typing import Dict, Any
+import time
 
 class BaseAgent(ABC):
     """Base class for autonomous agents with independent execution."""
@@ -13,6 +15,14 @@ class BaseAgent(ABC):
         self.state: Dict[str, Any] = {}
         self.running = Event()
         self.thread = None
+        # Replies inherit the priority and tenant of the message being handled
+        self.current_priority = MessagePriority.NORMAL
+        self.current_tenant = "default"
+        # Shared by the workers of an agent id when set by the orchestrator;
+        # otherwise created on the first CONTROL message. None means no overhead
+        self.profiler = None
+        # Messages handled so far; sampled by the autoscaler for processing rate
+        self.processed = 0
 
         # Register with message bus
         self.message_bus.register_agent(self.agent_id)
@@ -24,9 +34,15 @@ class BaseAgent(ABC):
         self.thread.start()
         print(f"[{self.agent_id}] Agent started and running autonomously")
 
-    def stop(self):
-        """Stop agent execution."""
+    def request_stop(self):
+        """Ask the loop to exit after its in-flight message, without waiting for it."""
         self.running.clear()
+        # Workers of one agent id share a queue; only this one should leave its wait
+        self.message_bus.wake_cancelled(self.agent_id)
+
+    def stop(self):
+        """Stop agent execution once the in-flight message (if any) completes."""
+        self.request_stop()
         if self.thread:
             self.thread.join(timeout=5)
         print(f"[{self.agent_id}] Agent stopped")
@@ -34,15 +50,51 @@ class BaseAgent(ABC):
     def _run_loop(self):
         """Main execution loop - agent autonomously processes messages."""
         while self.running.is_set():
-            message = self.message_bus.receive_message(self.agent_id, timeout=0.5)
+            # Block without a timeout; stop() wakes us, so idle agents never poll
+            try:
+                message = self.message_bus.receive_message(
+                    self.agent_id, timeout=None, cancelled=self._stop_requested
+                )
+            except (ConnectionError, OSError) as e:
+                # A remote bus dropped the link; receives are not resent, so ask again once it is back
+                print(f"[{self.agent_id}] Bus connection failed: {str(e)}")
+                time.sleep(1.0)
+                continue
 
             if message:
                 print(f"[{self.agent_id}] Received {message.message_type.value} from {message.sender}")
+                self.current_priority = message.priority
+                self.current_tenant = message.tenant
+
+                if message.message_type == MessageType.CONTROL:
+                    self._handle_control(message)
+                    continue
+
                 try:
-                    self.handle_message(message)
+                    if self.profiler is not None and self.profiler.active:
+                        self.profiler.run(self.handle_message, message)
+                    else:
+                        self.handle_message(message)
                 except Exception as e:
                     print(f"[{self.agent_id}] Error handling message: {str(e)}")
                     self._send_error(message.sender, str(e), message.conversation_id)
+                self.processed += 1
+
+    def _stop_requested(self) -> bool:
+        return not self.running.is_set()
+
+    def _handle_control(self, message: Message):
+        """Apply a runtime control action (profiling toggles and dumps) and report the result."""
+        action = message.content.get("action")
+        try:
+            if self.profiler is None:
+                self.profiler = AgentProfiler(self.agent_id, message.content.get("output_dir", "profiles"))
+            result = self.profiler.handle(action, message.content)
+            content = {"control": action, "status": "success", **result}
+        except Exception as e:
+            content = {"control": action, "status": "error", "error": str(e)}
+        print(f"[{self.agent_id}] Control {action}: {content['status']}")
+        self.send_message(message.sender, MessageType.RESPONSE, content, message.conversation_id)
 
     @abstractmethod
     def handle_message(self, message: Message):
@@ -57,11 +109,13 @@ class BaseAgent(ABC):
             message_type=message_type,
             content=content,
             timestamp=None,
-            conversation_id=conversation_id
+            conversation_id=conversation_id,
+            priority=self.current_priority,
+            tenant=self.current_tenant
         )
         self.message_bus.send_message(message)
         print(f"[{self.agent_id}] Sent {message_type.value} to {receiver}")
 
-    def _send_error(self, receiver: str, error: str, conversation_id: str):
-        """Send error message."""
-        self.send_message(receiver, MessageType.ERROR, {"error": error}, conversation_id)
+    def _send_error(self, receiver: str, error: str, conversation_id: str, retryable: bool = True):
+        """Send error message; retryable=False tells the orchestrator a retry cannot help."""
+        self.send_message(receiver, MessageType.ERROR, {"error": error, "retryable": retryable}, conversation_id)
@@ -1,6 +1,7 @@
 from agents.base_agent import BaseAgent
 from messaging.message_types import Message, MessageType
 from models.product_model import ProductModel
+from models.validator import PRODUCT_VALIDATOR
 
 class DataParserAgent(BaseAgent):
     """Autonomous agent for parsing and validating product data."""
@@ -15,10 +16,10 @@ class DataParserAgent(BaseAgent):
                 raw_data = message.content.get("data")
                 try:
                     print(f"[{self.agent_id}] Parsing product data...")
-                    product = ProductModel.from_dict(raw_data)
 
-                    # Validate data
-                    self._validate_product(product)
+                    # Validate every field up front so the error lists all problems
+                    PRODUCT_VALIDATOR.check(raw_data)
+                    product = ProductModel.from_dict(raw_data)
 
                     # Send parsed data back to requester
                     self.send_message(
@@ -35,17 +36,13 @@ class DataParserAgent(BaseAgent):
                         message_type=MessageType.INFORM,
                         content={"event": "product_parsed", "product": product.to_dict()},
                         timestamp=None,
-                        conversation_id=message.conversation_id
+                        conversation_id=message.conversation_id,
+                        priority=message.priority,
+                        tenant=message.tenant
                     )
                     self.message_bus.broadcast(broadcast_msg, exclude=[self.agent_id, message.sender])
 
                 except Exception as e:
                     print(f"[{self.agent_id}] Error parsing data: {str(e)}")
-                    self._send_error(message.sender, str(e), message.conversation_id)
-
-    def _validate_product(self, product: ProductModel):
-        """Validate product data."""
-        if not product.name:
-            raise ValueError("Product name is required")
-        if product.price <= 0:
-            raise ValueError("Product price must be positive")
+                    # Invalid input fails the same way every time
+                    self._send_error(message.sender, str(e), message.conversation_id, retryable=False)
@@ -1,14 +1,19 @@
 from agents.base_agent import BaseAgent
 from messaging.message_types import Message, MessageType
 from models.product_model import ProductModel
+from content_blocks.question_bank import default_question_bank
+from llm.client import TextClient
 
 class FAQGeneratorAgent(BaseAgent):
     """Autonomous agent for generating FAQ pages."""
 
-    def __init__(self, agent_id: str, message_bus):
+    def __init__(self, agent_id: str, message_bus, text_client: TextClient = None):
         super().__init__(agent_id, message_bus)
         self.product_data = None
         self.questions = None
+        self.faq_target = default_question_bank().faq_target
+        # Model-written answers when set; template answers otherwise and on timeout
+        self.text_client = text_client
 
     def handle_message(self, message: Message):
         """Process messages autonomously."""
@@ -53,11 +58,18 @@ class FAQGeneratorAgent(BaseAgent):
     def _generate_faq_page(self, questions: list, product: ProductModel) -> dict:
         """Generate FAQ page with answers."""
         faqs = []
+        questions = questions[:self.faq_target]
+        answers = [self._generate_answer(q, product) for q in questions]
 
-        for q in questions[:15]:  # Minimum 15 questions
+        if self.text_client:
+            prompts = [self._answer_prompt(q, answer, product) for q, answer in zip(questions, answers)]
+            completions = self.text_client.complete_many(prompts)
+            answers = [completion or answer for completion, answer in zip(completions, answers)]
+
+        for q, answer in zip(questions, answers):
             faq_item = {
                 "question": q["question"],
-                "answer": self._generate_answer(q, product),
+                "answer": answer,
                 "category": q["category"]
             }
             faqs.append(faq_item)
@@ -70,6 +82,15 @@ class FAQGeneratorAgent(BaseAgent):
             "categories": list(set([faq["category"] for faq in faqs]))
         }
 
+    def _answer_prompt(self, question: dict, template_answer: str, product: ProductModel) -> str:
+        """Prompt asking the model to phrase an answer grounded in the template facts."""
+        return (
+            f"Answer this customer question about {product.name} in one or two friendly sentences, "
+            f"using only the facts given.\n"
+            f"Question: {question['question']}\n"
+            f"Facts: {template_answer}"
+        )
+
     def _generate_answer(self, question: dict, product: ProductModel) -> str:
         """Generate contextual answers based on product data."""
         q_text = question["question"].lower()
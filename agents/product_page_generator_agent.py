@@ -1,13 +1,16 @@
 from agents.base_agent import BaseAgent
 from messaging.message_types import Message, MessageType
 from models.product_model import ProductModel
+from llm.client import TextClient
 
 class ProductPageGeneratorAgent(BaseAgent):
     """Autonomous agent for generating product pages."""
 
-    def __init__(self, agent_id: str, message_bus):
+    def __init__(self, agent_id: str, message_bus, text_client: TextClient = None):
         super().__init__(agent_id, message_bus)
         self.product_data = None
+        # Model-written descriptions when set; template copy otherwise and on timeout
+        self.text_client = text_client
 
     def handle_message(self, message: Message):
         """Process messages autonomously."""
@@ -47,17 +50,28 @@ class ProductPageGeneratorAgent(BaseAgent):
 
     def _generate_product_page(self, product: ProductModel) -> dict:
         """Generate complete product page."""
+        overview = f"A premium skincare serum designed for {' and '.join(product.skin_type).lower()} skin types."
+        benefits = f"{product.name} delivers {' and '.join([b.lower() for b in product.benefits])} for your skin."
+
+        if self.text_client:
+            completions = self.text_client.complete_many([
+                self._copy_prompt("a one-sentence product overview", overview, product),
+                self._copy_prompt("a one-sentence benefits summary", benefits, product),
+            ])
+            overview = completions[0] or overview
+            benefits = completions[1] or benefits
+
         return {
             "page_type": "Product Page",
             "product_name": product.name,
             "overview": {
                 "title": product.name,
                 "subtitle": product.concentration,
-                "description": f"A premium skincare serum designed for {' and '.join(product.skin_type).lower()} skin types."
+                "description": overview
             },
             "benefits": {
                 "heading": "Key Benefits",
-                "description": f"{product.name} delivers {' and '.join([b.lower() for b in product.benefits])} for your skin.",
+                "description": benefits,
                 "benefits_list": product.benefits
             },
             "ingredients": {
@@ -85,3 +99,11 @@ class ProductPageGeneratorAgent(BaseAgent):
                 "formatted_price": f"₹{product.price}"
             }
         }
+
+    def _copy_prompt(self, task: str, template_copy: str, product: ProductModel) -> str:
+        """Prompt asking the model for marketing copy grounded in the template text."""
+        return (
+            f"Write {task} for {product.name} ({product.concentration}), "
+            f"using only the facts given.\n"
+            f"Facts: {template_copy}"
+        )
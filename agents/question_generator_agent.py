@@ -1,6 +1,7 @@
 from agents.base_agent import BaseAgent
 from messaging.message_types import Message, MessageType
 from models.product_model import ProductModel
+from content_blocks.question_bank import default_question_bank
 
 class QuestionGeneratorAgent(BaseAgent):
     """Autonomous agent for generating user questions."""
@@ -8,6 +9,7 @@ class QuestionGeneratorAgent(BaseAgent):
     def __init__(self, agent_id: str, message_bus):
         super().__init__(agent_id, message_bus)
         self.product_data = None
+        self.question_bank = default_question_bank()
 
     def handle_message(self, message: Message):
         """Process messages autonomously."""
@@ -24,6 +26,11 @@ class QuestionGeneratorAgent(BaseAgent):
             action = message.content.get("action")
 
             if action == "generate_questions":
+                product_dict = message.content.get("product")
+
+                if product_dict:
+                    self.product_data = ProductModel.from_dict(product_dict)
+
                 if not self.product_data:
                     # Agent autonomously requests missing data
                     print(f"[{self.agent_id}] Don't have product data, requesting...")
@@ -47,43 +54,5 @@ class QuestionGeneratorAgent(BaseAgent):
                 )
 
     def _generate_questions(self, product: ProductModel) -> list:
-        """Generate categorized questions."""
-        questions = []
-
-        # Informational (4 questions)
-        questions.extend([
-            {"question": f"What is {product.name}?", "category": "Informational"},
-            {"question": "What are the key ingredients?", "category": "Informational"},
-            {"question": "What skin types is it suitable for?", "category": "Informational"},
-            {"question": "What is the concentration?", "category": "Informational"},
-        ])
-
-        # Safety (3 questions)
-        questions.extend([
-            {"question": "Are there any side effects?", "category": "Safety"},
-            {"question": "Is it safe for sensitive skin?", "category": "Safety"},
-            {"question": "Can I use it with other products?", "category": "Safety"},
-        ])
-
-        # Usage (4 questions)
-        questions.extend([
-            {"question": f"How do I use {product.name}?", "category": "Usage"},
-            {"question": "When should I apply it?", "category": "Usage"},
-            {"question": "How much should I use?", "category": "Usage"},
-            {"question": "Can I use it daily?", "category": "Usage"},
-        ])
-
-        # Purchase (3 questions)
-        questions.extend([
-            {"question": "What is the price?", "category": "Purchase"},
-            {"question": "Where can I buy it?", "category": "Purchase"},
-            {"question": "Is it worth the price?", "category": "Purchase"},
-        ])
-
-        # Comparison (2 questions)
-        questions.extend([
-            {"question": "How does it compare to other serums?", "category": "Comparison"},
-            {"question": f"What makes {product.name} unique?", "category": "Comparison"},
-        ])
-
-        return questions
+        """Generate categorized questions from the compiled question bank."""
+        return self.question_bank.generate(product)
@@ -0,0 +1,82 @@
+"""Multi-producer MessageBus throughput.
+
+Each producer thread sends to its own agent, which has a consumer thread
+draining it, while one extra thread broadcasts and registers agents in the
+background. Reports delivered messages per second for each producer count.
+
+Run from the repository root: python -m benchmarks.bus_benchmark [messages_per_producer]
+"""
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from threading import Event, Thread
+from messaging.message_bus import MessageBus
+from messaging.message_types import Message, MessageType
+
+
+def _message(receiver: str, i: int) -> Message:
+    return Message(
+        sender="producer",
+        receiver=receiver,
+        message_type=MessageType.REQUEST,
+        content={"i": i},
+        timestamp=None,
+        conversation_id="benchmark"
+    )
+
+
+def run(producers: int, count: int) -> float:
+    bus = MessageBus()
+    agents = [f"agent-{i}" for i in range(producers)]
+    for agent_id in agents:
+        bus.register_agent(agent_id)
+    messages = {agent_id: [_message(agent_id, i) for i in range(count)] for agent_id in agents}
+    background_done = Event()
+
+    def produce(agent_id):
+        send = bus.send_message
+        for message in messages[agent_id]:
+            send(message)
+
+    def consume(agent_id):
+        received = 0
+        while received < count:
+            if bus.receive_message(agent_id, timeout=1) is not None:
+                received += 1
+
+    def background():
+        i = 0
+        while not background_done.is_set():
+            bus.broadcast(_message(None, i), exclude=agents)
+            bus.register_agent(f"late-{i % 64}")
+            i += 1
+            time.sleep(0.001)
+
+    threads = [Thread(target=consume, args=(a,)) for a in agents]
+    threads += [Thread(target=produce, args=(a,)) for a in agents]
+    noise = Thread(target=background)
+
+    start = time.perf_counter()
+    noise.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    background_done.set()
+    noise.join()
+    return producers * count / elapsed
+
+
+def main(count: int = 50000):
+    print(f"MessageBus throughput, {count:,} messages per producer")
+    for producers in (1, 2, 4, 8, 16):
+        # The bus logs every registration; keep that terminal output out of the timed region
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            rate = run(producers, count)
+        print(f"  {producers:>2} producer(s)  {rate:>12,.0f} msg/s  ({rate / producers:>10,.0f} per producer)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
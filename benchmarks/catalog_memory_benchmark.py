@@ -0,0 +1,36 @@
+"""Memory per product: ProductModel dataclasses vs ColumnarCatalog.
+
+Run from the repository root: python -m benchmarks.catalog_memory_benchmark [count]
+"""
+import sys
+import tracemalloc
+from benchmarks.synthetic_catalog import generate_products
+from catalog.columnar_store import ColumnarCatalog
+from models.product_model import ProductModel
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main(count: int = 100000):
+    # Rows are decoded from JSON-like dicts in both cases; the source dicts
+    # are produced lazily so they are not counted
+    models, model_bytes = _measure(lambda: [ProductModel.from_dict(p) for p in generate_products(count)])
+    del models
+    catalog, columnar_bytes = _measure(lambda: ColumnarCatalog.from_products(generate_products(count)))
+
+    assert catalog[count - 1].to_dict() == list(generate_products(count))[-1]
+    print(f"{count:,} products")
+    print(f"  ProductModel list  {model_bytes / count:>8.1f} bytes/product")
+    print(f"  ColumnarCatalog    {columnar_bytes / count:>8.1f} bytes/product "
+          f"({model_bytes / columnar_bytes:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
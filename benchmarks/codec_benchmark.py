@@ -0,0 +1,57 @@
+"""Compare the binary codec against json for Message and ProductModel records.
+
+Run from the repository root: python -m benchmarks.codec_benchmark [count]
+"""
+import json
+import sys
+import time
+from benchmarks.synthetic_catalog import generate_products
+from messaging.codec import decode_message, decode_product, encode_message, encode_product
+from messaging.message_types import Message, MessageType
+from models.product_model import ProductModel
+
+
+def _time(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return time.perf_counter() - start, results
+
+
+def _report(label, items, encode, decode):
+    encode_time, encoded = _time(encode, items)
+    decode_time, _ = _time(decode, encoded)
+    size = sum(len(e) for e in encoded)
+    print(f"  {label:<8} encode {len(items) / encode_time:>10,.0f}/s  "
+          f"decode {len(items) / decode_time:>10,.0f}/s  "
+          f"avg size {size / len(items):>7.1f} B")
+
+
+def main(count: int = 20000):
+    products = [ProductModel.from_dict(p) for p in generate_products(count)]
+    messages = [
+        Message(
+            sender="data_parser",
+            receiver="orchestrator",
+            message_type=MessageType.RESPONSE,
+            content={"product": p.to_dict(), "status": "success"},
+            timestamp=None,
+            conversation_id=f"conversation-{i}"
+        )
+        for i, p in enumerate(products)
+    ]
+
+    print(f"ProductModel ({count:,} records)")
+    _report("json", products,
+            lambda p: json.dumps(p.to_dict()).encode("utf-8"),
+            lambda b: ProductModel.from_dict(json.loads(b)))
+    _report("codec", products, encode_product, decode_product)
+
+    print(f"Message ({count:,} records)")
+    _report("json", messages,
+            lambda m: json.dumps(m.to_dict()).encode("utf-8"),
+            lambda b: Message.from_dict(json.loads(b)))
+    _report("codec", messages, encode_message, decode_message)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
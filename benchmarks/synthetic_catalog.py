@@ -0,0 +1,30 @@
+"""Deterministic synthetic product catalogs for benchmarks."""
+import random
+
+SKIN_TYPES = ["Oily", "Dry", "Combination", "Normal", "Sensitive"]
+INGREDIENTS = [
+    "Vitamin C", "Vitamin E", "Hyaluronic Acid", "Niacinamide", "Retinol", "Ferulic Acid",
+    "Salicylic Acid", "Glycolic Acid", "Ceramides", "Peptides", "Squalane", "Zinc",
+]
+BENEFITS = [
+    "Brightening", "Hydration", "Anti-aging", "Fades dark spots", "Oil control",
+    "Acne control", "Soothing", "Firming", "Exfoliation",
+]
+PRODUCT_TYPES = ["Serum", "Essence", "Cream", "Gel", "Toner"]
+
+
+def generate_products(count: int, seed: int = 42):
+    """Yield `count` product dictionaries in the data/product_data.json format."""
+    rng = random.Random(seed)
+    for i in range(count):
+        ingredients = rng.sample(INGREDIENTS, rng.randint(2, 4))
+        yield {
+            "name": f"Synthetic {ingredients[0]} {rng.choice(PRODUCT_TYPES)} {i:07d}",
+            "concentration": f"{rng.choice([2, 5, 10, 15, 20])}% {ingredients[0]}",
+            "skin_type": rng.sample(SKIN_TYPES, rng.randint(1, 3)),
+            "key_ingredients": ingredients,
+            "benefits": rng.sample(BENEFITS, rng.randint(1, 3)),
+            "usage": f"Apply {rng.randint(2, 4)} drops in the {rng.choice(['morning', 'evening'])} after cleansing",
+            "side_effects": rng.choice(["Mild tingling for sensitive skin", "None known", "May cause dryness"]),
+            "price": rng.randint(199, 2999),
+        }
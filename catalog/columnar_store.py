@@ -0,0 +1,183 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Union
+from models.product_model import ProductModel
+
+LIST_COLUMNS = ("skin_type", "key_ingredients", "benefits")
+# Free-text columns that repeat heavily across a catalog and are interned
+INTERNED_COLUMNS = ("concentration", "usage", "side_effects")
+
+
+class Vocabulary:
+    """Interns strings to dense integer codes."""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self._codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def lookup(self, value: str):
+        """Code of an already interned string, or None."""
+        return self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class ProductRow:
+    """Lightweight read-only view of one catalog row with ProductModel's attributes."""
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: "ColumnarCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._catalog._name(self._index)
+
+    @property
+    def concentration(self) -> str:
+        return self._catalog._interned_value("concentration", self._index)
+
+    @property
+    def skin_type(self) -> List[str]:
+        return self._catalog._list_value("skin_type", self._index)
+
+    @property
+    def key_ingredients(self) -> List[str]:
+        return self._catalog._list_value("key_ingredients", self._index)
+
+    @property
+    def benefits(self) -> List[str]:
+        return self._catalog._list_value("benefits", self._index)
+
+    @property
+    def usage(self) -> str:
+        return self._catalog._interned_value("usage", self._index)
+
+    @property
+    def side_effects(self) -> str:
+        return self._catalog._interned_value("side_effects", self._index)
+
+    @property
+    def price(self):
+        price = self._catalog._prices[self._index]
+        return int(price) if price.is_integer() else price
+
+    def to_dict(self) -> dict:
+        """Same dictionary as ProductModel.to_dict()."""
+        return {
+            "name": self.name,
+            "concentration": self.concentration,
+            "skin_type": self.skin_type,
+            "key_ingredients": self.key_ingredients,
+            "benefits": self.benefits,
+            "usage": self.usage,
+            "side_effects": self.side_effects,
+            "price": self.price
+        }
+
+    def to_model(self) -> ProductModel:
+        """Materialize a full ProductModel for this row."""
+        return ProductModel.from_dict(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"ProductRow({self._index}, {self.name!r})"
+
+
+class ColumnarCatalog:
+    """Append-only, column-oriented product store.
+
+    List fields are stored as integer codes into per-column vocabularies,
+    laid out as one flat value array plus an offsets array (row i spans
+    values[offsets[i]:offsets[i + 1]], with 64-bit offsets). Repeated free-text fields are
+    interned the same way, names are packed UTF-8 with their own offsets
+    and prices live in a typed double array, so a row costs roughly the
+    size of its name plus a few dozen bytes instead of a dataclass with
+    three lists (see benchmarks/catalog_memory_benchmark.py). Iterating it
+    yields ProductRow views that WorkflowOrchestrator.run_catalog accepts
+    directly.
+    """
+
+    def __init__(self):
+        self._name_data = bytearray()
+        self._name_offsets = array("Q", [0])
+        self._prices = array("d")
+        self.vocabularies: Dict[str, Vocabulary] = {
+            column: Vocabulary() for column in LIST_COLUMNS + INTERNED_COLUMNS
+        }
+        self._codes: Dict[str, array] = {column: array("I") for column in INTERNED_COLUMNS}
+        self._offsets: Dict[str, array] = {column: array("Q", [0]) for column in LIST_COLUMNS}
+        self._values: Dict[str, array] = {column: array("I") for column in LIST_COLUMNS}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Union[dict, ProductModel]]) -> "ColumnarCatalog":
+        catalog = cls()
+        catalog.extend(products)
+        return catalog
+
+    def append(self, product: Union[dict, ProductModel]) -> int:
+        """Add a product (dict or ProductModel) and return its row index."""
+        data = product.to_dict() if isinstance(product, ProductModel) else product
+
+        self._name_data += data["name"].encode("utf-8")
+        self._name_offsets.append(len(self._name_data))
+        self._prices.append(data["price"])
+        for column in INTERNED_COLUMNS:
+            self._codes[column].append(self.vocabularies[column].code(data[column]))
+        for column in LIST_COLUMNS:
+            vocabulary = self.vocabularies[column]
+            values = self._values[column]
+            values.extend(vocabulary.code(item) for item in data[column])
+            self._offsets[column].append(len(values))
+
+        return len(self._prices) - 1
+
+    def extend(self, products: Iterable[Union[dict, ProductModel]]):
+        for product in products:
+            self.append(product)
+
+    def _name(self, index: int) -> str:
+        offsets = self._name_offsets
+        return self._name_data[offsets[index]:offsets[index + 1]].decode("utf-8")
+
+    def _interned_value(self, column: str, index: int) -> str:
+        return self.vocabularies[column].strings[self._codes[column][index]]
+
+    def _list_value(self, column: str, index: int) -> List[str]:
+        offsets = self._offsets[column]
+        strings = self.vocabularies[column].strings
+        return [strings[code] for code in self._values[column][offsets[index]:offsets[index + 1]]]
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __getitem__(self, index: int) -> ProductRow:
+        if index < 0:
+            index += len(self._prices)
+        if not 0 <= index < len(self._prices):
+            raise IndexError("catalog index out of range")
+        return ProductRow(self, index)
+
+    def __iter__(self) -> Iterator[ProductRow]:
+        for index in range(len(self._prices)):
+            yield ProductRow(self, index)
+
+    def rows_with(self, column: str, value: str) -> Iterator[ProductRow]:
+        """Rows whose list column contains `value`, scanning integer codes only."""
+        code = self.vocabularies[column].lookup(value)
+        if code is None:
+            return
+        offsets = self._offsets[column]
+        values = self._values[column]
+        for index in range(len(self._prices)):
+            if code in values[offsets[index]:offsets[index + 1]]:
+                yield ProductRow(self, index)
@@ -0,0 +1,206 @@
+from array import array
+from typing import Optional
+from catalog.reader import CatalogFormatError
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+# Sidecar layout: header, then three column blocks of `slots` entries each:
+# key hashes (u64), record offsets (u64) and record lengths (u32), all
+# little-endian. Slots form an open-addressing hash table with linear
+# probing; a zero hash marks an empty slot.
+INDEX_MAGIC = b"KCIX"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sB3xQqQQ")  # magic, version, catalog size, catalog mtime_ns, slots, records
+INDEX_SUFFIX = ".idx"
+
+
+class StaleIndexError(CatalogFormatError):
+    """Raised when an index does not match the current catalog file."""
+
+
+def default_index_path(catalog_path: str) -> str:
+    return catalog_path + INDEX_SUFFIX
+
+
+def _key_hash(name: str) -> int:
+    value = int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def build_index(catalog_path: str, index_path: str = None) -> str:
+    """Record the byte offset and length of every product in a JSONL catalog.
+
+    Records are keyed by product name; when a name repeats, the last record
+    wins, as it would when the catalog is generated in order. Names whose
+    hashes collide get separate slots. Lines that are
+    blank, not JSON or have no string name are skipped. Returns the sidecar
+    path (`<catalog>.idx` by default).
+    """
+    if os.path.splitext(catalog_path)[1].lower() not in (".jsonl", ".ndjson"):
+        raise CatalogFormatError(f"Offset indexes need a JSONL catalog: {catalog_path}")
+    index_path = index_path or default_index_path(catalog_path)
+
+    hashes = array("Q")
+    offsets = array("Q")
+    lengths = array("I")
+    with open(catalog_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        offset = 0
+        for line in f:
+            length = len(line)
+            record = line.strip()
+            if record:
+                name = _record_name(record)
+                if name is not None:
+                    hashes.append(_key_hash(name))
+                    offsets.append(offset)
+                    lengths.append(len(line.rstrip(b"\r\n")))
+            offset += length
+
+        # Keep the table at most half full so probes stay short
+        slots = 1
+        while slots < 2 * len(hashes):
+            slots *= 2
+        mask = slots - 1
+        table_hashes = array("Q", bytes(8 * slots))
+        table_offsets = array("Q", bytes(8 * slots))
+        table_lengths = array("I", bytes(4 * slots))
+        records = 0
+        for key, record_offset, record_length in zip(hashes, offsets, lengths):
+            slot = key & mask
+            name = None
+            while table_hashes[slot]:
+                if table_hashes[slot] == key:
+                    # Equal hashes are almost always a repeated name; re-read both to tell a collision apart
+                    if name is None:
+                        name = _read_name(f, record_offset, record_length)
+                    if _read_name(f, table_offsets[slot], table_lengths[slot]) == name:
+                        break
+                slot = (slot + 1) & mask
+            if not table_hashes[slot]:
+                records += 1
+            table_hashes[slot] = key
+            table_offsets[slot] = record_offset
+            table_lengths[slot] = record_length
+
+    if sys.byteorder == "big":
+        for column in (table_hashes, table_offsets, table_lengths):
+            column.byteswap()
+
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as out:
+        out.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns, slots, records))
+        table_hashes.tofile(out)
+        table_offsets.tofile(out)
+        table_lengths.tofile(out)
+    os.replace(temp_path, index_path)
+    print(f"[OffsetIndex] Indexed {records} product(s) of {catalog_path} into {index_path}")
+    return index_path
+
+
+def _record_name(record: bytes) -> Optional[str]:
+    try:
+        name = json.loads(record).get("name")
+    except (ValueError, AttributeError):
+        return None
+    return name if isinstance(name, str) else None
+
+
+def _read_name(f, offset: int, length: int) -> Optional[str]:
+    f.seek(offset)
+    return _record_name(f.read(length))
+
+
+class CatalogIndex:
+    """Random access to single products of a large JSONL catalog.
+
+    Both the catalog and its sidecar index are memory-mapped; a lookup
+    hashes the name, probes the on-disk table (usually one slot) and parses
+    only that record's bytes, so its I/O does not grow with catalog size.
+    """
+
+    def __init__(self, catalog_path: str, index_path: str = None):
+        self.catalog_path = catalog_path
+        self.index_path = index_path or default_index_path(catalog_path)
+        self._catalog = self._index = self._index_file = None
+        self._catalog_file = open(catalog_path, "rb")
+        try:
+            self._index_file = open(self.index_path, "rb")
+            index_size = os.fstat(self._index_file.fileno()).st_size
+            if index_size < _INDEX_HEADER.size:
+                raise CatalogFormatError(f"Truncated catalog index: {self.index_path}")
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, size, mtime_ns, self._slots, self._records = _INDEX_HEADER.unpack_from(self._index)
+            if magic != INDEX_MAGIC:
+                raise CatalogFormatError(f"Not a catalog index: {self.index_path}")
+            if version != INDEX_VERSION:
+                raise CatalogFormatError(f"Unsupported catalog index version {version}: {self.index_path}")
+            if self._slots & (self._slots - 1) or index_size != _INDEX_HEADER.size + 20 * self._slots:
+                raise CatalogFormatError(f"Corrupt catalog index: {self.index_path}")
+            stat = os.fstat(self._catalog_file.fileno())
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                raise StaleIndexError(f"{self.index_path} is out of date for {catalog_path}")
+            # An empty file cannot be mapped; it also has no records to find
+            self._catalog = mmap.mmap(self._catalog_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        except Exception:
+            self.close()
+            raise
+        self._hashes_at = _INDEX_HEADER.size
+        self._offsets_at = self._hashes_at + 8 * self._slots
+        self._lengths_at = self._offsets_at + 8 * self._slots
+
+    @classmethod
+    def open(cls, catalog_path: str, index_path: str = None) -> "CatalogIndex":
+        """Open the index, building or rebuilding it first if it is missing, stale or unreadable."""
+        index_path = index_path or default_index_path(catalog_path)
+        if os.path.exists(index_path):
+            try:
+                return cls(catalog_path, index_path)
+            except CatalogFormatError as e:
+                # Stale, truncated, corrupt or another version: the catalog is the source of truth
+                print(f"[OffsetIndex] Rebuilding index: {e}")
+        build_index(catalog_path, index_path)
+        return cls(catalog_path, index_path)
+
+    def get(self, name: str) -> Optional[dict]:
+        """The product record named `name`, or None if the catalog has none."""
+        if not self._slots:
+            return None
+        key = _key_hash(name)
+        mask = self._slots - 1
+        slot = key & mask
+        index = self._index
+        while True:
+            (stored,) = struct.unpack_from("<Q", index, self._hashes_at + 8 * slot)
+            if not stored:
+                return None
+            if stored == key:
+                (offset,) = struct.unpack_from("<Q", index, self._offsets_at + 8 * slot)
+                (length,) = struct.unpack_from("<I", index, self._lengths_at + 4 * slot)
+                record = json.loads(self._catalog[offset:offset + length])
+                # Guards against 64-bit hash collisions
+                if record.get("name") == name:
+                    return record
+            slot = (slot + 1) & mask
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return self._records
+
+    def close(self):
+        for resource in (self._catalog, self._index, self._index_file, self._catalog_file):
+            # An empty catalog is mapped as b"", which needs no closing
+            if resource is not None and hasattr(resource, "close"):
+                resource.close()
+
+    def __enter__(self) -> "CatalogIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
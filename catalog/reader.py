@@ -0,0 +1,262 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, TextIO, Tuple, Union
+from models.validator import CompiledValidator, PRODUCT_VALIDATOR
+import csv
+import json
+import os
+
+# Product fields holding lists; in CSV they are '|'-separated or a JSON array
+LIST_FIELDS = ("skin_type", "key_ingredients", "benefits")
+CSV_LIST_SEPARATOR = "|"
+# A JSON record still undecodable after this many characters is malformed, not merely split across chunks
+MAX_RECORD_CHARS = 16 * 1024 * 1024
+# Raw text of an unparseable record kept in its reject line
+MAX_REJECT_TEXT = 4096
+
+
+class CatalogFormatError(ValueError):
+    """Raised when a catalog file cannot be parsed."""
+
+
+class UnparseableRecord(NamedTuple):
+    """Stands in for a JSONL line that is not valid JSON, so one bad line becomes a reject, not a failed run."""
+    location: str
+    error: str
+    text: str
+
+
+def _decode_line(line: Union[str, bytes], location: str):
+    """A JSONL line's record, or an UnparseableRecord describing why it has none."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return UnparseableRecord(location, str(e), line.strip()[:MAX_REJECT_TEXT])
+
+
+def iter_products(path: str, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    """Lazily yield raw product dictionaries from a JSONL, CSV or JSON catalog.
+
+    The format follows the file extension (.jsonl/.ndjson, .csv, .json).
+    Records are parsed one at a time, so memory use does not grow with the
+    size of the catalog. A JSONL line that is not valid JSON is yielded as
+    an UnparseableRecord, which iter_valid_products() routes to the reject
+    file; a malformed JSON array cannot be resynchronised and raises
+    CatalogFormatError.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if extension in (".jsonl", ".ndjson"):
+            yield from _iter_jsonl(f)
+        elif extension == ".csv":
+            yield from _iter_csv(f)
+        elif extension == ".json":
+            yield from _iter_json(f, chunk_size)
+        else:
+            raise CatalogFormatError(f"Unsupported catalog format: {path}")
+
+
+def _iter_jsonl(f: TextIO) -> Iterator[dict]:
+    for line_number, line in enumerate(f, 1):
+        if line.strip():
+            yield _decode_line(line, f"line {line_number}")
+
+
+def jsonl_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a JSONL file into `parts` contiguous byte ranges that start at line boundaries.
+
+    Ranges cover the file in order; some may be empty when the file has
+    fewer lines than parts.
+    """
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, "rb") as f:
+        for part in range(1, parts):
+            f.seek(max(size * part // parts, starts[-1]))
+            if f.tell() > 0:
+                # Move past the rest of the line the cut landed in
+                f.seek(f.tell() - 1)
+                f.readline()
+            starts.append(min(f.tell(), size))
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def iter_jsonl_range(path: str, start: int, end: int) -> Iterator[dict]:
+    """Yield the records of the JSONL lines that start within [start, end)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                yield _decode_line(line, f"byte offset {position}")
+            position += len(line)
+
+
+def count_jsonl_records(path: str, end: int) -> int:
+    """Number of non-blank JSONL lines that start before byte `end`."""
+    count = 0
+    with open(path, "rb") as f:
+        position = 0
+        for line in f:
+            if position >= end:
+                break
+            if line.strip():
+                count += 1
+            position += len(line)
+    return count
+
+
+def _iter_csv(f: TextIO) -> Iterator[dict]:
+    for row in csv.DictReader(f):
+        product = {key: (value.strip() if value is not None else "") for key, value in row.items() if key}
+        for field in LIST_FIELDS:
+            if field in product:
+                product[field] = _parse_list(product[field])
+        if "price" in product:
+            product["price"] = _parse_number(product["price"])
+        yield product
+
+
+def _parse_list(value: str) -> list:
+    """Parse a CSV list cell: a JSON array or '|'-separated values.
+
+    A cell that starts with '[' but is not a JSON array is left as text,
+    so validation rejects the row instead of the run failing.
+    """
+    if value.startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+
+
+def _parse_number(value: str):
+    """Convert a CSV price cell to int or float, leaving unparseable text for validation."""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _iter_json(f: TextIO, chunk_size: int) -> Iterator[dict]:
+    """Incrementally decode a JSON array of products (or a single product object)."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    eof = not buffer
+
+    if buffer.startswith("{"):
+        # A single product document, as in data/product_data.json
+        document = buffer + f.read(MAX_RECORD_CHARS + 1 - len(buffer))
+        if len(document) > MAX_RECORD_CHARS:
+            raise CatalogFormatError(f"Product document exceeds {MAX_RECORD_CHARS} characters")
+        try:
+            yield json.loads(document)
+        except ValueError as e:
+            raise CatalogFormatError(f"Invalid JSON document: {e}") from None
+        return
+    if not buffer.startswith("["):
+        raise CatalogFormatError("Expected a JSON array or object")
+
+    buffer = buffer[1:]
+    # After "[" or "," a value is due; after a value only "," or "]" may follow
+    expect_value = True
+    first = True
+    element = 0
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        if not expect_value:
+            if buffer.startswith(","):
+                buffer = buffer[1:]
+                expect_value = True
+                continue
+            if buffer.startswith("]"):
+                return
+            if not buffer:
+                raise CatalogFormatError("Truncated or invalid JSON array")
+            raise CatalogFormatError("Expected ',' or ']' after an array element")
+
+        if buffer.startswith("]"):
+            if first:
+                return
+            raise CatalogFormatError("Trailing comma in JSON array")
+        if buffer.startswith(","):
+            raise CatalogFormatError("Missing element between commas in JSON array")
+
+        try:
+            product, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            # An error at the end of the buffer (or in a string running to it) may just be a record
+            # split across chunks; anything earlier is malformed, and reading on would not fix it
+            split = e.pos >= len(buffer) - 1 or e.msg.startswith("Unterminated string")
+            if eof or not split:
+                raise CatalogFormatError(f"Array element {element}: {e.msg}") from None
+            if len(buffer) > MAX_RECORD_CHARS:
+                raise CatalogFormatError(f"Array element {element} exceeds {MAX_RECORD_CHARS} characters") from None
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield product
+        element += 1
+        first = False
+        expect_value = False
+        buffer = buffer[end:]
+        if len(buffer) < chunk_size and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+
+def iter_valid_products(products: Iterable[dict], reject_path: str,
+                        validator: CompiledValidator = PRODUCT_VALIDATOR,
+                        batch_size: int = 1000, first_row: int = 0) -> Iterator[dict]:
+    """Yield only valid products, writing rejects to a JSONL file.
+
+    Records are validated a batch at a time before they reach the message
+    pipeline. Each reject line holds the record's position in the input
+    (counted from `first_row`, for inputs that are part of a larger file),
+    every validation error and the record itself; for an UnparseableRecord
+    the error is the JSON error at its line or offset and the record is
+    the raw text.
+    """
+    products = iter(products)
+    offset = first_row
+    rejected = 0
+
+    os.makedirs(os.path.dirname(reject_path) or ".", exist_ok=True)
+    with open(reject_path, "w", encoding="utf-8") as rejects:
+        while True:
+            batch = list(islice(products, batch_size))
+            if not batch:
+                break
+
+            valid, invalid = validator.validate_batch(batch)
+            for index, record, errors in invalid:
+                if isinstance(record, UnparseableRecord):
+                    errors = [f"{record.location}: {record.error}"]
+                    record = record.text
+                rejects.write(json.dumps(
+                    {"row": offset + index, "errors": errors, "record": record},
+                    ensure_ascii=False
+                ) + "\n")
+            rejected += len(invalid)
+            offset += len(batch)
+
+            yield from valid
+
+    print(f"[CatalogReader] Validated {offset - first_row} record(s), rejected {rejected} to {reject_path}")
@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+from threading import Event
+from typing import Callable, Dict, Optional, Set, Tuple
+from catalog.reader import CatalogFormatError, UnparseableRecord, iter_products
+from models.validator import PRODUCT_VALIDATOR
+import hashlib
+import json
+import os
+import time
+
+CATALOG_EXTENSIONS = (".json", ".jsonl", ".ndjson", ".csv")
+
+
+@dataclass
+class ChangeSet:
+    """Products to (re)generate and product names whose pages should be removed."""
+    upserts: Dict[str, dict] = field(default_factory=dict)
+    removed: Set[str] = field(default_factory=set)
+
+    def merge(self, later: "ChangeSet"):
+        """Fold in changes observed after this set; the later state of a product wins."""
+        for name, record in later.upserts.items():
+            self.upserts[name] = record
+            self.removed.discard(name)
+        for name in later.removed:
+            self.upserts.pop(name, None)
+            self.removed.add(name)
+
+    def __bool__(self) -> bool:
+        return bool(self.upserts or self.removed)
+
+
+@dataclass
+class _FileState:
+    stat: Tuple[int, int]
+    digest: bytes
+    # Product name -> digest of its canonical record
+    products: Dict[str, bytes]
+
+
+class CatalogWatcher:
+    """Detects added, changed and removed products under a directory.
+
+    A file is only read when its (mtime, size) differs from the last scan,
+    and only re-parsed when its content hash differs too, so touching a file
+    costs a read and nothing more. Within a changed file each product is
+    compared by the hash of its canonical JSON, so only products that
+    actually changed are reported.
+    """
+
+    def __init__(self, directory: str, extensions: Tuple[str, ...] = CATALOG_EXTENSIONS):
+        self.directory = directory
+        self.extensions = extensions
+        self._files: Dict[str, _FileState] = {}
+
+    def poll(self) -> ChangeSet:
+        """Scan the directory once and return what changed since the previous scan."""
+        changes = ChangeSet()
+        seen = set()
+
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.lower().endswith(self.extensions) or name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                seen.add(path)
+                try:
+                    self._scan_file(path, changes)
+                except OSError as e:
+                    print(f"[CatalogWatcher] Cannot read {path}: {e}")
+
+        for path in set(self._files) - seen:
+            changes.removed.update(self._files.pop(path).products)
+
+        self._resolve_removals(changes)
+        return changes
+
+    def _resolve_removals(self, changes: ChangeSet):
+        """Keep products that disappeared from one file but still exist in another.
+
+        Applies to whole-file and per-record removals alike. The surviving
+        record is regenerated, because the pages may have been generated
+        from the copy that was just removed.
+        """
+        if not changes.removed:
+            return
+        for path in sorted(self._files):
+            survivors = changes.removed & self._files[path].products.keys()
+            if not survivors:
+                continue
+            changes.removed -= survivors
+            missing = survivors - changes.upserts.keys()
+            if missing:
+                for record in self._read_products(path):
+                    if record["name"] in missing:
+                        changes.upserts[record["name"]] = record
+
+    def _scan_file(self, path: str, changes: ChangeSet):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        state = self._files.get(path)
+        if state is not None and state.stat == key:
+            return
+
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+        if state is not None and state.digest == digest:
+            state.stat = key
+            return
+
+        previous = state.products if state is not None else {}
+        try:
+            products = self._read_products(path)
+        except (CatalogFormatError, ValueError) as e:
+            # Likely a save in progress; keep the old products until the file parses
+            print(f"[CatalogWatcher] Skipping {path}: {e}")
+            self._files[path] = _FileState(key, digest, previous)
+            return
+
+        current = {}
+        for record in products:
+            record_digest = hashlib.blake2b(
+                json.dumps(record, sort_keys=True).encode("utf-8"), digest_size=16
+            ).digest()
+            current[record["name"]] = record_digest
+            if previous.get(record["name"]) != record_digest:
+                changes.upserts[record["name"]] = record
+
+        changes.removed.update(set(previous) - set(current))
+        self._files[path] = _FileState(key, digest, current)
+
+    def _read_products(self, path: str):
+        products = []
+        for row, record in enumerate(iter_products(path)):
+            if isinstance(record, UnparseableRecord):
+                # Usually a save in progress; _scan_file keeps the previous products
+                raise CatalogFormatError(f"{record.location}: {record.error}")
+            errors = PRODUCT_VALIDATOR.validate(record)
+            if errors:
+                print(f"[CatalogWatcher] Ignoring invalid record {row} in {path}: {'; '.join(errors)}")
+            else:
+                products.append(record)
+        return products
+
+    def watch(self, on_change: Callable[[ChangeSet], None], interval: float = 0.5,
+              debounce: float = 1.0, stop: Optional[Event] = None):
+        """Poll until `stop` is set, calling on_change once a burst of edits has settled.
+
+        Changes are accumulated until no new change has been seen for
+        `debounce` seconds, so saving several files (or one file several
+        times) in quick succession triggers a single regeneration.
+        """
+        stop = stop or Event()
+        pending = ChangeSet()
+        last_change = 0.0
+
+        while not stop.is_set():
+            changes = self.poll()
+            now = time.monotonic()
+            if changes:
+                pending.merge(changes)
+                last_change = now
+            if pending and now - last_change >= debounce:
+                on_change(pending)
+                pending = ChangeSet()
+            stop.wait(interval)
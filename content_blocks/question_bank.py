@@ -0,0 +1,121 @@
+from string import Formatter
+from typing import Any, Callable, List, Optional, Tuple
+import json
+import os
+
+DEFAULT_QUESTION_BANK_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "question_bank.json")
+
+# Product attributes usable as template slots, e.g. "How do I use {name}?"
+SLOT_FIELDS = ("name", "concentration", "usage", "side_effects", "price")
+
+Condition = Callable[[Any], bool]
+
+
+class QuestionTemplate:
+    """One compiled question: fixed text or a format string, plus an optional condition."""
+
+    __slots__ = ("text", "category", "slots", "condition")
+
+    def __init__(self, text: str, category: str, condition: Optional[Condition] = None):
+        self.text = text
+        self.category = category
+        self.slots = tuple(field for _, field, _, _ in Formatter().parse(text) if field)
+        self.condition = condition
+        for slot in self.slots:
+            if slot not in SLOT_FIELDS:
+                raise ValueError(f"Unknown slot '{slot}' in question: {text}")
+
+
+class QuestionBank:
+    """Question templates loaded from a data file and compiled once.
+
+    Static questions need no per-product work, templated ones are filled
+    from product attributes, and conditional ones are kept only for
+    products matching their `when` rule.
+    """
+
+    def __init__(self, templates: List[QuestionTemplate], faq_target: int):
+        self.templates = templates
+        self.faq_target = faq_target
+        self._has_slots = any(t.slots for t in templates)
+        self._slot_fields = tuple(sorted({slot for t in templates for slot in t.slots}))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_QUESTION_BANK_PATH) -> "QuestionBank":
+        """Load and compile a question bank JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuestionBank":
+        templates = []
+        for category in data["categories"]:
+            for entry in category["questions"]:
+                if isinstance(entry, str):
+                    entry = {"text": entry}
+                condition = _compile_condition(entry["when"]) if "when" in entry else None
+                templates.append(QuestionTemplate(entry["text"], category["name"], condition))
+        return cls(templates, data.get("faq_target", 15))
+
+    def generate(self, product) -> List[dict]:
+        """Questions for one product (ProductModel or any object with its attributes)."""
+        return self.generate_batch([product])[0]
+
+    def generate_batch(self, products: List[Any]) -> List[List[dict]]:
+        """Questions for many products in one pass over the compiled templates."""
+        results: List[List[dict]] = [[] for _ in products]
+        slot_values: List[Optional[dict]] = [
+            {field: getattr(p, field) for field in self._slot_fields} if self._has_slots else None
+            for p in products
+        ]
+
+        for template in self.templates:
+            category = template.category
+            text = template.text
+            condition = template.condition
+            for i, product in enumerate(products):
+                if condition is not None and not condition(product):
+                    continue
+                question = text.format_map(slot_values[i]) if template.slots else text
+                results[i].append({"question": question, "category": category})
+
+        return results
+
+    @property
+    def categories(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(t.category for t in self.templates))
+
+
+def _compile_condition(rule: dict) -> Condition:
+    """Compile a `when` rule into a predicate over product attributes.
+
+    Rules: {"field": f, "contains": v} (list field holds v, case-insensitive),
+    {"field": f, "mentions": v} (text field contains v, case-insensitive),
+    and {"any": [rules]} / {"all": [rules]}.
+    """
+    if "any" in rule:
+        parts = [_compile_condition(r) for r in rule["any"]]
+        return lambda product: any(p(product) for p in parts)
+    if "all" in rule:
+        parts = [_compile_condition(r) for r in rule["all"]]
+        return lambda product: all(p(product) for p in parts)
+
+    field = rule["field"]
+    if "contains" in rule:
+        needle = rule["contains"].lower()
+        return lambda product: any(item.lower() == needle for item in getattr(product, field))
+    if "mentions" in rule:
+        needle = rule["mentions"].lower()
+        return lambda product: needle in getattr(product, field).lower()
+    raise ValueError(f"Unsupported question condition: {rule}")
+
+
+_default_bank: Optional[QuestionBank] = None
+
+
+def default_question_bank() -> QuestionBank:
+    """The bundled question bank, loaded on first use and shared."""
+    global _default_bank
+    if _default_bank is None:
+        _default_bank = QuestionBank.load()
+    return _default_bank
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import List
+import time
+
+class TextBackend(ABC):
+    """Text-generation model behind the LLM client.
+
+    Backends receive whole batches so providers with batch endpoints can
+    serve many prompts per request; one completion is returned per prompt,
+    in order.
+    """
+
+    # Largest batch the backend accepts per call
+    max_batch_size = 16
+
+    @abstractmethod
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """Return one completion per prompt."""
+        pass
+
+
+class StubBackend(TextBackend):
+    """Deterministic offline backend with configurable latency.
+
+    Each call sleeps `latency` seconds plus `per_prompt_latency` per prompt,
+    which is enough to exercise batching, concurrency limits and timeouts
+    without a model. The completion for a prompt is the text after its
+    last "Facts:" line (the template answer the agents embed), or a fixed
+    echo of the prompt otherwise, so output is reproducible.
+    """
+
+    def __init__(self, latency: float = 0.0, per_prompt_latency: float = 0.0, max_batch_size: int = 16):
+        self.latency = latency
+        self.per_prompt_latency = per_prompt_latency
+        self.max_batch_size = max_batch_size
+        self.calls = 0
+        self.prompts = 0
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        self.calls += 1
+        self.prompts += len(prompts)
+        delay = self.latency + self.per_prompt_latency * len(prompts)
+        if delay > 0:
+            time.sleep(delay)
+        return [self._complete(prompt) for prompt in prompts]
+
+    def _complete(self, prompt: str) -> str:
+        _, marker, facts = prompt.rpartition("Facts:")
+        if marker:
+            return facts.strip()
+        return f"[stub] {prompt.strip()}"
@@ -0,0 +1,139 @@
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Condition, Thread
+from typing import Deque, Dict, List, Optional, Tuple
+from llm.backend import TextBackend
+import time
+
+class TextClient:
+    """Shared front end to a TextBackend for the generator agents.
+
+    - Micro-batching: prompts from all callers (and so from concurrent
+      conversations) are collected for up to `batch_window` seconds or
+      until the backend's max batch size, then sent as one batch.
+    - Concurrency limit: at most `max_concurrency` backend calls run at
+      once; while all slots are busy prompts keep accumulating into the
+      next batch.
+    - Cache: completions are kept in an LRU of `cache_size` prompts, and
+      identical prompts already in flight share one backend request.
+    - Timeouts: complete_many() returns None for any prompt not answered
+      within `timeout`, so callers fall back to their template text. Late
+      completions still land in the cache.
+    """
+
+    def __init__(self, backend: TextBackend, max_concurrency: int = 4, batch_window: float = 0.005,
+                 cache_size: int = 4096, timeout: float = 2.0):
+        self.backend = backend
+        self.batch_window = batch_window
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.stats = {"prompts": 0, "cache_hits": 0, "batches": 0, "timeouts": 0, "errors": 0}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._cond = Condition()
+        self._closed = False
+        self._slots = BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._batcher = Thread(target=self._batch_loop, name="llm-batcher", daemon=True)
+        self._batcher.start()
+
+    def complete(self, prompt: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Completion for one prompt, or None on timeout or backend error."""
+        return self.complete_many([prompt], timeout)[0]
+
+    def complete_many(self, prompts: List[str], timeout: Optional[float] = None) -> List[Optional[str]]:
+        """Completions for several prompts, with None wherever one is unavailable in time."""
+        results: List[Optional[str]] = [None] * len(prompts)
+        waiting: List[Tuple[int, Future]] = []
+
+        with self._cond:
+            self.stats["prompts"] += len(prompts)
+            for i, prompt in enumerate(prompts):
+                cached = self._cache.get(prompt)
+                if cached is not None:
+                    self._cache.move_to_end(prompt)
+                    self.stats["cache_hits"] += 1
+                    results[i] = cached
+                    continue
+                future = self._in_flight.get(prompt)
+                if future is None:
+                    future = Future()
+                    self._in_flight[prompt] = future
+                    self._pending.append((prompt, future))
+                waiting.append((i, future))
+            if waiting:
+                self._cond.notify()
+
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        for i, future in waiting:
+            try:
+                results[i] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            # Only an alias of the builtin TimeoutError from Python 3.11
+            except FutureTimeoutError:
+                self._count("timeouts")
+            except Exception:
+                self._count("errors")
+        return results
+
+    def close(self):
+        """Stop batching and wait for running backend calls."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._batcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _count(self, key: str):
+        with self._cond:
+            self.stats[key] += 1
+
+    def _batch_loop(self):
+        max_batch = max(1, self.backend.max_batch_size)
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    for prompt, future in self._pending:
+                        self._in_flight.pop(prompt, None)
+                        future.cancel()
+                    self._pending.clear()
+                    return
+                # Give other callers a short window to join this batch
+                deadline = time.monotonic() + self.batch_window
+                while len(self._pending) < max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            # Wait for a free backend slot outside the lock; prompts keep queueing meanwhile
+            self._slots.acquire()
+            with self._cond:
+                batch = [self._pending.popleft() for _ in range(min(max_batch, len(self._pending)))]
+                self.stats["batches"] += 1
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]):
+        try:
+            completions = self.backend.generate_batch([prompt for prompt, _ in batch])
+            if len(completions) != len(batch):
+                raise ValueError(f"Backend returned {len(completions)} completions for {len(batch)} prompts")
+        except Exception as e:
+            with self._cond:
+                for prompt, future in batch:
+                    self._in_flight.pop(prompt, None)
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        with self._cond:
+            for (prompt, future), completion in zip(batch, completions):
+                self._in_flight.pop(prompt, None)
+                self._cache[prompt] = completion
+                self._cache.move_to_end(prompt)
+                future.set_result(completion)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -1,34 +1,402 @@
+import argparse
 import json
-from orchestrator.workflow_orchestrator import WorkflowOrchestrator
+import math
+import threading
+from orchestrator.pipeline_profile import PROFILES, resolve_profile
+from orchestrator.workflow_orchestrator import AGENT_CLASSES, WorkflowOrchestrator
 
 def load_product_data():
     """Load product data from JSON file."""
     with open("data/product_data.json", "r") as f:
         return json.load(f)
 
+def parse_profile(value):
+    """argparse type for --profile: a profile name or a comma-separated page list."""
+    try:
+        return resolve_profile(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_tenant_weight(value):
+    """argparse type for --tenant-weight: 'TENANT=WEIGHT' with a positive, finite weight."""
+    tenant, separator, weight = value.partition("=")
+    if not separator or not tenant:
+        raise argparse.ArgumentTypeError(f"expected TENANT=WEIGHT, got {value!r}")
+    try:
+        number = float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"weight of tenant {tenant!r} must be a number, got {weight!r}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise argparse.ArgumentTypeError(f"weight of tenant {tenant!r} must be a positive number, got {weight!r}")
+    return tenant, number
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Kasparro AI multi-agent content generation")
+    parser.add_argument("--bus", help="Use a socket message bus at host:port or unix:/path")
+    parser.add_argument("--bus-format", choices=("json", "codec"), default="json",
+                        help="Frame encoding for --bus clients: json, or the smaller binary codec")
+    parser.add_argument("--remote-agents", nargs="*", default=[], choices=sorted(AGENT_CLASSES),
+                        help="Agents hosted by separate 'agent' processes (requires --bus)")
+    parser.add_argument("--sqlite", help="Store pages in this SQLite database instead of output/*.json")
+    parser.add_argument("--catalog", action="append", metavar="[TENANT=]PATH",
+                        help="Stream products from a .jsonl, .csv or .json catalog; repeat with "
+                             "TENANT=PATH to share the agents fairly between several brands")
+    parser.add_argument("--product", action="append", default=[], metavar="NAME",
+                        help="Regenerate only these products of a .jsonl catalog, read through its "
+                             "offset index (built on first use)")
+    parser.add_argument("--tenant-weight", action="append", default=[], metavar="TENANT=WEIGHT",
+                        type=parse_tenant_weight,
+                        help="Give a tenant a larger (or smaller) share of agent capacity")
+    parser.add_argument("--max-in-flight", type=int, default=32,
+                        help="Products generated concurrently in catalog mode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Catalog mode: split each catalog into contiguous ranges across this many processes")
+    parser.add_argument("--max-workers", type=int, default=1,
+                        help="Autoscale each local agent up to this many workers based on queue depth")
+    parser.add_argument("--llm-stub-latency", type=float,
+                        help="Write FAQ answers and page copy through the offline stub text backend "
+                             "with this latency per backend call (seconds)")
+    parser.add_argument("--profile", type=parse_profile, default="full", metavar="PROFILE",
+                        help=f"Pages to generate: one of {', '.join(PROFILES)} or a comma-separated list "
+                             "of faq_page, product_page and comparison_page; only the stages they need run")
+    parser.add_argument("--search-index", metavar="PATH",
+                        help="Index generated FAQ and product pages for search, updating this index file")
+    parser.add_argument("--rejects", default="output/rejects.jsonl",
+                        help="Where invalid catalog records are written in catalog mode")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the HTTP generation service; with --catalog, beside that catalog run on the same agents")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--pool-size", type=int, default=4, help="Number of warm orchestrators (without --catalog)")
+    serve_parser.add_argument("--max-in-flight", dest="serve_max_in_flight", type=int, default=16,
+                              help="Maximum concurrent generations")
+
+    watch_parser = subparsers.add_parser("watch", help="Regenerate pages whenever product files change")
+    watch_parser.add_argument("directory", help="Directory of .json, .jsonl or .csv product files")
+    watch_parser.add_argument("--interval", type=float, default=0.5, help="Seconds between scans")
+    watch_parser.add_argument("--debounce", type=float, default=1.0,
+                              help="Wait until edits have been quiet this long before regenerating")
+
+    search_parser = subparsers.add_parser("search", help="Query a page index built with --search-index")
+    search_parser.add_argument("query", help='e.g. \'category:safety skin:oily\' or \'ingredient:"vitamin c" -page:faq\'')
+    search_parser.add_argument("--index", required=True, help="Index file written by --search-index")
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum matches to print")
+    search_parser.add_argument("--products", action="store_true", help="List matching product names only")
+
+    bus_parser = subparsers.add_parser("bus", help="Host a socket message bus for distributed agents")
+    bus_parser.add_argument("--listen", default="127.0.0.1:7000", help="host:port or unix:/path")
+
+    agent_parser = subparsers.add_parser("agent", help="Run one agent against a socket message bus")
+    agent_parser.add_argument("agent_id", choices=sorted(AGENT_CLASSES))
+    agent_parser.add_argument("--bus", dest="agent_bus", required=True, help="host:port or unix:/path")
+
+    return parser.parse_args()
+
+def create_message_bus(address, wire_format="json"):
+    """Socket message bus client when an address is given, otherwise the in-process default."""
+    if not address:
+        return None
+    from messaging.socket_transport import SocketMessageBus
+    return SocketMessageBus(address, wire_format=wire_format)
+
+def create_output_sink(sqlite_path, per_product=False):
+    """SQLite sink when a database path is given, otherwise JSON files in output/."""
+    if not sqlite_path:
+        from storage.output_sink import FileOutputSink
+        return FileOutputSink("output", per_product=per_product)
+    from storage.sqlite_sink import SQLiteOutputSink
+    return SQLiteOutputSink(sqlite_path)
+
+def load_page_index(path):
+    """The page index stored at `path`, an empty one if the file does not exist yet, or None without a path."""
+    if not path:
+        return None
+    import os
+    from search.page_index import PageIndex
+    return PageIndex.load(path) if os.path.exists(path) else PageIndex()
+
+def create_text_backend(stub_latency):
+    """Stub text backend when a latency is given, otherwise None (template copy)."""
+    if stub_latency is None:
+        return None
+    from llm.backend import StubBackend
+    return StubBackend(latency=stub_latency)
+
+def create_text_client(stub_latency):
+    """Text client over the stub backend when a latency is given, otherwise None (template copy)."""
+    backend = create_text_backend(stub_latency)
+    if backend is None:
+        return None
+    from llm.client import TextClient
+    return TextClient(backend)
+
+def parse_catalogs(specs):
+    """Map tenant -> catalog path from '[TENANT=]PATH' arguments."""
+    catalogs = {}
+    for spec in specs:
+        tenant, separator, path = spec.partition("=")
+        catalogs[tenant if separator else "default"] = path if separator else spec
+    return catalogs
+
+def reject_path_for(tenant, base_path):
+    """Reject file of a tenant: the base path, suffixed with the tenant name unless it is 'default'."""
+    if tenant == "default":
+        return base_path
+    import os
+    root, extension = os.path.splitext(base_path)
+    return f"{root}-{tenant}{extension}"
+
+def parse_tenant_weights(specs):
+    """Map tenant -> weight from parsed --tenant-weight arguments; a repeated tenant keeps its last weight."""
+    return dict(specs)
+
+def run_sharded_catalog(args):
+    """Generate a catalog with one orchestrator per worker process."""
+    from orchestrator.sharded_runner import run_sharded
+    if args.bus or args.remote_agents:
+        # Every shard runs its own in-process agents and bus
+        raise ValueError("--workers > 1 cannot be combined with --bus or --remote-agents")
+    catalogs = parse_catalogs(args.catalog)
+    report = run_sharded(
+        catalogs,
+        workers=args.workers,
+        reject_paths={tenant: reject_path_for(tenant, args.rejects) for tenant in catalogs},
+        sqlite_path=args.sqlite,
+        max_in_flight=args.max_in_flight,
+        tenant_weights=parse_tenant_weights(args.tenant_weight),
+        profile=args.profile,
+        max_workers=args.max_workers,
+        text_backend=create_text_backend(args.llm_stub_latency)
+    )
+    for tenant, tenant_report in report["tenants"].items():
+        print(f"Tenant {tenant}: {tenant_report}")
+
+def iter_selected_products(path, names):
+    """Named products of a JSONL catalog, each read with one indexed lookup."""
+    from catalog.offset_index import CatalogIndex
+    with CatalogIndex.open(path) as index:
+        for name in names:
+            product = index.get(name)
+            if product is None:
+                print(f"Product not found in {path}: {name}")
+            else:
+                yield product
+
+def run_catalog(args):
+    """Generate pages for every product in one catalog file per tenant."""
+    if args.workers > 1 and not args.product:
+        if args.search_index:
+            # Pages of other processes never reach this process's index
+            print("[catalog] --search-index needs pages in one process; ignoring --workers")
+        else:
+            run_sharded_catalog(args)
+            return
+    text_client = create_text_client(args.llm_stub_latency)
+    orchestrator = create_catalog_orchestrator(args, text_client)
+    try:
+        run_catalog_on(orchestrator, args)
+    finally:
+        orchestrator.shutdown()
+        if text_client:
+            text_client.close()
+
+def create_catalog_orchestrator(args, text_client):
+    """Orchestrator for a catalog run, with per-product output and the requested tenant weights."""
+    orchestrator = WorkflowOrchestrator(
+        message_bus=create_message_bus(args.bus, args.bus_format),
+        remote_agents=args.remote_agents,
+        output_sink=create_output_sink(args.sqlite, per_product=True),
+        max_workers=args.max_workers,
+        text_client=text_client,
+        page_index=load_page_index(args.search_index),
+        profile=args.profile
+    )
+    for tenant, weight in parse_tenant_weights(args.tenant_weight).items():
+        orchestrator.message_bus.set_tenant_weight(tenant, weight)
+    return orchestrator
+
+def run_catalog_on(orchestrator, args):
+    """Stream the --catalog files through an orchestrator and print the per-tenant report."""
+    from catalog.reader import iter_products, iter_valid_products
+    read = (lambda path: iter_selected_products(path, args.product)) if args.product else iter_products
+    catalogs = {
+        tenant: iter_valid_products(read(path), reject_path_for(tenant, args.rejects))
+        for tenant, path in parse_catalogs(args.catalog).items()
+    }
+    orchestrator.run_catalogs(catalogs, max_in_flight=args.max_in_flight)
+    for tenant, report in orchestrator.tenant_report().items():
+        print(f"Tenant {tenant}: {report}")
+    if orchestrator.page_index is not None:
+        orchestrator.page_index.save(args.search_index)
+
+def run_serve(args):
+    """Serve HTTP generation requests; with --catalog, on the orchestrator running that catalog."""
+    from service.generation_server import serve
+    if not args.catalog:
+        serve(args.host, args.port, pool_size=args.pool_size, max_in_flight=args.serve_max_in_flight)
+        return
+    # Requests join the catalog's agent queues as INTERACTIVE work and overtake its BULK backlog
+    text_client = create_text_client(args.llm_stub_latency)
+    orchestrator = create_catalog_orchestrator(args, text_client)
+    threading.Thread(target=run_catalog_on, args=(orchestrator, args), name="catalog", daemon=True).start()
+    try:
+        serve(args.host, args.port, max_in_flight=args.serve_max_in_flight, orchestrator=orchestrator)
+    finally:
+        orchestrator.shutdown()
+        if text_client:
+            text_client.close()
+
+def run_watch(args):
+    """Keep a warm orchestrator and regenerate only products whose files changed."""
+    from catalog.watcher import CatalogWatcher
+    output_sink = create_output_sink(args.sqlite, per_product=True)
+    if not output_sink.supports_delete:
+        # Checked up front: removed products must be deletable before anything is watched
+        raise SystemExit(f"Watch mode needs an output sink that can delete pages, not {type(output_sink).__name__}")
+    text_client = create_text_client(args.llm_stub_latency)
+    orchestrator = WorkflowOrchestrator(
+        message_bus=create_message_bus(args.bus, args.bus_format),
+        remote_agents=args.remote_agents,
+        output_sink=output_sink,
+        max_workers=args.max_workers,
+        text_client=text_client,
+        page_index=load_page_index(args.search_index),
+        profile=args.profile
+    )
+    page_index = orchestrator.page_index
+
+    def regenerate(changes):
+        print(f"[watch] {len(changes.upserts)} product(s) to generate, {len(changes.removed)} removed")
+        for name in changes.removed:
+            orchestrator.output_sink.delete(name)
+            if page_index is not None:
+                page_index.remove_product(name)
+        orchestrator.run_catalog(changes.upserts.values(), max_in_flight=args.max_in_flight)
+        if page_index is not None:
+            page_index.save(args.search_index)
+
+    print(f"[watch] Watching {args.directory} (Ctrl+C to stop)")
+    try:
+        CatalogWatcher(args.directory).watch(regenerate, interval=args.interval, debounce=args.debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        orchestrator.shutdown()
+        if text_client:
+            text_client.close()
+
+def run_search(args):
+    """Print pages (or products) of a saved page index that match a boolean query."""
+    from search.page_index import PageIndex, QuerySyntaxError
+    try:
+        index = PageIndex.load(args.index)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read index: {e}")
+        return
+    try:
+        if args.products:
+            names = index.matching_products(args.query)
+            for name in names[:args.limit]:
+                print(name)
+            print(f"{len(names)} product(s) match")
+            return
+        hits = index.search(args.query, limit=args.limit)
+        total = index.count(args.query)
+    except QuerySyntaxError as e:
+        print(f"Invalid query: {e}")
+        return
+    for hit in hits:
+        location = f"{hit.page_type}[{hit.item}]" if hit.item is not None else hit.page_type
+        print(f"{hit.product}: {location}")
+    print(f"{total} page(s) match, showing {len(hits)}")
+
+def run_bus(address):
+    """Host a message bus for agents in other processes."""
+    from messaging.socket_transport import SocketBusServer
+    server = SocketBusServer(address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+def run_agent(agent_id, address, wire_format="json"):
+    """Run a single agent connected to a remote message bus until interrupted."""
+    agent = AGENT_CLASSES[agent_id](agent_id, create_message_bus(address, wire_format))
+    agent.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        agent.stop()
+
 def main():
     """Main entry point for autonomous multi-agent system."""
+    args = parse_args()
+
+    if args.command == "serve":
+        run_serve(args)
+        return
+    if args.command == "watch":
+        run_watch(args)
+        return
+    if args.command == "search":
+        run_search(args)
+        return
+    if args.command == "bus":
+        run_bus(args.listen)
+        return
+    if args.command == "agent":
+        run_agent(args.agent_id, args.agent_bus, args.bus_format)
+        return
+
     print("\n" + "="*70)
     print("Kasparro AI - Multi-Agent Content Generation System")
     print("True Autonomous Agent Architecture with Message Passing")
     print("="*70 + "\n")
 
     try:
+        if args.catalog:
+            run_catalog(args)
+            print("\n✅ Catalog generation completed!")
+            return
+
         # Load input data
         product_data = load_product_data()
         print(f"Loaded product: {product_data['name']}\n")
 
         # Initialize orchestrator (automatically starts all agents)
-        orchestrator = WorkflowOrchestrator()
+        text_client = create_text_client(args.llm_stub_latency)
+        orchestrator = WorkflowOrchestrator(
+            message_bus=create_message_bus(args.bus, args.bus_format),
+            remote_agents=args.remote_agents,
+            output_sink=create_output_sink(args.sqlite),
+            max_workers=args.max_workers,
+            text_client=text_client,
+            page_index=load_page_index(args.search_index),
+            profile=args.profile
+        )
 
         # Run the autonomous pipeline
         orchestrator.run_pipeline(product_data)
+        if orchestrator.page_index is not None:
+            orchestrator.page_index.save(args.search_index)
+        print(f"Latency report: {orchestrator.latency_report()}")
+        orchestrator.shutdown()
+        if text_client:
+            text_client.close()
 
         print("\n✅ Content generation completed successfully!")
         print("\nGenerated files in output/ directory:")
-        print("  - faq.json (FAQ page with 15+ questions)")
-        print("  - product_page.json (Complete product page)")
-        print("  - comparison_page.json (Product comparison)\n")
+        descriptions = {
+            "faq_page": "faq.json (FAQ page with 15+ questions)",
+            "product_page": "product_page.json (Complete product page)",
+            "comparison_page": "comparison_page.json (Product comparison)",
+        }
+        for page in args.profile.page_order:
+            print(f"  - {descriptions[page]}")
+        print()
 
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
@@ -0,0 +1,222 @@
+from collections import deque
+from threading import Condition
+from typing import Callable, Deque, Dict, Optional, Tuple
+from messaging.message_types import Message, MessagePriority
+import time
+
+class TenantLane:
+    """One priority lane split into per-tenant FIFOs served by deficit round-robin.
+
+    Tenants with queued messages take turns; on its turn a tenant may send
+    as many messages as its accumulated credit allows, earning `weight`
+    credit (default 1) each time it comes round. A tenant's share of the
+    lane is therefore proportional to its weight and independent of how
+    many messages it has queued.
+    """
+
+    __slots__ = ("_queues", "_ring", "_credit", "_weights", "_size")
+
+    def __init__(self, weights: Dict[str, float]):
+        self._queues: Dict[str, Deque[Tuple[float, Message]]] = {}
+        self._ring: Deque[str] = deque()
+        self._credit: Dict[str, float] = {}
+        self._weights = weights
+        self._size = 0
+
+    def append(self, message: Message):
+        tenant = message.tenant
+        queue = self._queues.get(tenant)
+        if queue is None:
+            queue = self._queues[tenant] = deque()
+            self._credit[tenant] = 0.0
+            self._ring.append(tenant)
+        queue.append((time.monotonic(), message))
+        self._size += 1
+
+    def popleft(self) -> Tuple[float, Message]:
+        """Next (enqueued_at, message) in deficit round-robin order."""
+        ring = self._ring
+        while True:
+            tenant = ring[0]
+            credit = self._credit[tenant]
+            if credit < 1:
+                credit += self._weights.get(tenant, 1.0)
+                if credit < 1:
+                    self._credit[tenant] = credit
+                    ring.rotate(-1)
+                    continue
+
+            queue = self._queues[tenant]
+            item = queue.popleft()
+            self._size -= 1
+            credit -= 1
+            if not queue:
+                # Idle tenants leave the ring and do not bank credit
+                del self._queues[tenant], self._credit[tenant]
+                ring.popleft()
+            else:
+                self._credit[tenant] = credit
+                if credit < 1:
+                    ring.rotate(-1)
+            return item
+
+    def discard(self, conversation_id: str) -> int:
+        removed = 0
+        for tenant in list(self._ring):
+            queue = self._queues[tenant]
+            kept = deque(item for item in queue if item[1].conversation_id != conversation_id)
+            if len(kept) == len(queue):
+                continue
+            removed += len(queue) - len(kept)
+            if kept:
+                self._queues[tenant] = kept
+            else:
+                del self._queues[tenant], self._credit[tenant]
+                self._ring.remove(tenant)
+        self._size -= removed
+        return removed
+
+    def tenant_sizes(self) -> Dict[str, int]:
+        return {tenant: len(queue) for tenant, queue in self._queues.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class AgentQueue:
+    """Per-agent queue with priority lanes whose blocked readers can be woken without a message.
+
+    Each MessagePriority has its own lane and the highest non-empty lane is
+    served first. To keep bulk traffic moving, a waiting lane that has been
+    passed over `starvation_limit` times in a row is served next. Within a
+    lane, tenants are served by weighted deficit round-robin (TenantLane),
+    so one tenant's backlog cannot delay another tenant's messages.
+    """
+
+    def __init__(self, starvation_limit: int = 16, tenant_weights: Dict[str, float] = None):
+        # Shared with the bus so weight changes apply to every queue
+        self.tenant_weights = tenant_weights if tenant_weights is not None else {}
+        self._lanes: Dict[MessagePriority, TenantLane] = {
+            priority: TenantLane(self.tenant_weights) for priority in sorted(MessagePriority, reverse=True)
+        }
+        self._skipped: Dict[MessagePriority, int] = {priority: 0 for priority in MessagePriority}
+        self._size = 0
+        self.starvation_limit = starvation_limit
+        self._cond = Condition()
+        self._wake_generation = 0
+        # tenant -> [messages dequeued, total queue wait, max queue wait]
+        self._tenant_waits: Dict[str, list] = {}
+
+    def put(self, message: Message):
+        """Enqueue a message in its priority lane and wake one waiting reader."""
+        with self._cond:
+            # IntEnum keys hash like ints, so plain int priorities index lanes too
+            self._lanes[message.priority].append(message)
+            self._size += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None,
+            cancelled: Callable[[], bool] = None) -> Optional[Message]:
+        """Dequeue a message, blocking until one arrives, timeout or wake().
+
+        With timeout=None the caller sleeps until there is work or it is
+        explicitly woken, so idle readers never poll. `cancelled` is checked
+        under the queue lock, so a wake() issued just before the reader
+        started waiting is never lost. Returns None when the wait ends
+        without a message.
+        """
+        with self._cond:
+            generation = self._wake_generation
+            deadline = None if timeout is None else time.monotonic() + timeout
+
+            while not self._size:
+                if self._wake_generation != generation or (cancelled and cancelled()):
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+            return self._pop()
+
+    def _pop(self) -> Message:
+        """Take the next message by priority, honouring starvation protection."""
+        chosen = None
+        for priority, lane in self._lanes.items():
+            if lane and self._skipped[priority] >= self.starvation_limit:
+                chosen = priority
+                break
+
+        if chosen is None:
+            chosen = next(priority for priority, lane in self._lanes.items() if lane)
+
+        for priority, lane in self._lanes.items():
+            if priority == chosen or not lane:
+                self._skipped[priority] = 0
+            else:
+                self._skipped[priority] += 1
+
+        self._size -= 1
+        enqueued_at, message = self._lanes[chosen].popleft()
+
+        wait = time.monotonic() - enqueued_at
+        stats = self._tenant_waits.get(message.tenant)
+        if stats is None:
+            stats = self._tenant_waits[message.tenant] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += wait
+        if wait > stats[2]:
+            stats[2] = wait
+        return message
+
+    def discard(self, conversation_id: str) -> int:
+        """Remove queued messages belonging to a conversation; returns how many."""
+        with self._cond:
+            removed = sum(lane.discard(conversation_id) for lane in self._lanes.values())
+            self._size -= removed
+            return removed
+
+    def wake(self):
+        """Release every reader currently blocked in get()."""
+        with self._cond:
+            self._wake_generation += 1
+            self._cond.notify_all()
+
+    def wake_cancelled(self):
+        """Release only the blocked readers whose `cancelled` check now returns true.
+
+        The others re-check and keep waiting, so one worker of a shared
+        queue can be stopped without ending every worker's get().
+        """
+        with self._cond:
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        """Number of queued messages across all lanes."""
+        return self._size
+
+    def lane_sizes(self) -> Dict[str, int]:
+        """Number of queued messages per priority lane."""
+        with self._cond:
+            return {priority.name.lower(): len(lane) for priority, lane in self._lanes.items()}
+
+    def tenant_stats(self) -> Dict[str, dict]:
+        """Per-tenant queued count, messages served and queue wait in seconds."""
+        with self._cond:
+            queued: Dict[str, int] = {}
+            for lane in self._lanes.values():
+                for tenant, size in lane.tenant_sizes().items():
+                    queued[tenant] = queued.get(tenant, 0) + size
+            report = {}
+            for tenant in set(queued) | set(self._tenant_waits):
+                served, total_wait, max_wait = self._tenant_waits.get(tenant, (0, 0.0, 0.0))
+                report[tenant] = {
+                    "queued": queued.get(tenant, 0),
+                    "served": served,
+                    "avg_wait": round(total_wait / served, 4) if served else 0.0,
+                    "max_wait": round(max_wait, 4),
+                }
+            return report
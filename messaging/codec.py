@@ -0,0 +1,338 @@
+"""Compact, versioned binary codec for Message and ProductModel.
+
+Layout: a 4-byte header (magic b"KC", format version, record kind)
+followed by the record fields. Integers are zigzag varints, strings are
+either a reference into a string table or a new inline string that is
+appended to the table, so repeated vocabulary (skin types, ingredients,
+dictionary keys) costs one or two bytes after its first use. The table
+starts from SHARED_VOCABULARY, which encoder and decoder must agree on
+for a given format version; only append to it together with a version
+bump.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+from messaging.message_types import Message, MessageType, MessagePriority
+from models.product_model import ProductModel
+import struct
+
+FORMAT_VERSION = 2
+MAGIC = b"KC"
+KIND_MESSAGE = 1
+KIND_PRODUCT = 2
+KIND_VALUE = 3
+
+_HEADER = struct.Struct("!2sBB")
+_DOUBLE = struct.Struct("!d")
+_INT64 = struct.Struct("!q")
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR_NEW, _STR_REF, _LIST, _DICT, _BYTES = range(10)
+
+SHARED_VOCABULARY: Tuple[str, ...] = (
+    # Product fields
+    "name", "concentration", "skin_type", "key_ingredients", "benefits",
+    "usage", "side_effects", "price",
+    # Message content keys and values
+    "action", "data", "product", "questions", "question", "answer", "category",
+    "count", "status", "success", "error", "retryable", "event", "product_parsed",
+    "query", "need_product_data", "parse_data", "generate_questions", "generate_faq",
+    "generate_product_page", "generate_comparison", "faq_page", "product_page",
+    "comparison_page", "page_type", "product_name", "total_questions", "faqs", "categories",
+    # Agent ids
+    "orchestrator", "data_parser", "question_generator", "faq_generator",
+    "product_page_generator", "comparison_generator",
+    # Question categories
+    "Informational", "Safety", "Usage", "Purchase", "Comparison",
+    # Skin types
+    "Oily", "Dry", "Combination", "Normal", "Sensitive", "All",
+    # Common ingredients
+    "Vitamin C", "Vitamin E", "Hyaluronic Acid", "Niacinamide", "Retinol", "Ferulic Acid",
+    "Salicylic Acid", "Glycolic Acid", "Ceramides", "Peptides", "Squalane", "Zinc",
+    # Common benefits
+    "Brightening", "Hydration", "Anti-aging", "Fades dark spots", "Oil control",
+    "Acne control", "Soothing", "Firming", "Exfoliation",
+)
+
+_MESSAGE_TYPES: List[MessageType] = list(MessageType)
+_MESSAGE_TYPE_INDEX: Dict[MessageType, int] = {t: i for i, t in enumerate(_MESSAGE_TYPES)}
+_SHARED_INDEX: Dict[str, int] = {s: i for i, s in enumerate(SHARED_VOCABULARY)}
+_SHARED_SIZE = len(SHARED_VOCABULARY)
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class CodecError(ValueError):
+    """Raised when a buffer is not a valid record for this codec version."""
+
+
+class _Encoder:
+    """Single-record encoder holding the growing string table."""
+
+    def __init__(self, kind: int):
+        self.buffer = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, kind))
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, value: int):
+        buffer = self.buffer
+        while value > 0x7F:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def string(self, value: str):
+        index = _SHARED_INDEX.get(value)
+        if index is None:
+            index = self.strings.get(value)
+        if index is not None:
+            self.buffer.append(_STR_REF)
+            self.varint(index)
+            return
+        self.strings[value] = _SHARED_SIZE + len(self.strings)
+        raw = value.encode("utf-8")
+        self.buffer.append(_STR_NEW)
+        self.varint(len(raw))
+        self.buffer += raw
+
+    def value(self, value: Any):
+        buffer = self.buffer
+        if value is None:
+            buffer.append(_NONE)
+        elif value is True:
+            buffer.append(_TRUE)
+        elif value is False:
+            buffer.append(_FALSE)
+        elif isinstance(value, str):
+            self.string(value)
+        elif isinstance(value, int):
+            buffer.append(_INT)
+            self.varint((value << 1) if value >= 0 else ((-value << 1) - 1))
+        elif isinstance(value, float):
+            buffer.append(_FLOAT)
+            buffer += _DOUBLE.pack(value)
+        elif isinstance(value, dict):
+            buffer.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise CodecError(f"Dictionary keys must be strings, got {type(key).__name__}")
+                self.string(key)
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            buffer.append(_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, (bytes, bytearray)):
+            buffer.append(_BYTES)
+            self.varint(len(value))
+            buffer += value
+        else:
+            raise CodecError(f"Cannot encode value of type {type(value).__name__}")
+
+    def datetime(self, value: datetime):
+        offset = value.utcoffset()
+        if offset is None:
+            self.buffer.append(0)
+        else:
+            self.buffer.append(1)
+            self.value(int(offset.total_seconds()))
+            value = value.replace(tzinfo=None) - offset
+        self.buffer += _INT64.pack((value - _EPOCH) // _MICROSECOND)
+
+
+class _Decoder:
+    """Single-record decoder mirroring _Encoder."""
+
+    def __init__(self, data: bytes, kind: int):
+        if len(data) < _HEADER.size:
+            raise CodecError("Buffer too short for header")
+        magic, version, found_kind = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise CodecError("Not a codec record")
+        if version != FORMAT_VERSION:
+            raise CodecError(f"Unsupported codec version {version}")
+        if found_kind != kind:
+            raise CodecError(f"Expected record kind {kind}, found {found_kind}")
+        self.data = data
+        self.pos = _HEADER.size
+        self.strings: List[str] = []
+
+    def byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            self.pos = pos
+            return b
+        result = b & 0x7F
+        shift = 7
+        while True:
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def raw(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise IndexError("raw read past end of record")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def value(self) -> Any:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _STR_REF:
+            index = self.varint()
+            if index < _SHARED_SIZE:
+                return SHARED_VOCABULARY[index]
+            return self.strings[index - _SHARED_SIZE]
+        if tag == _STR_NEW:
+            text = self.raw(self.varint()).decode("utf-8")
+            self.strings.append(text)
+            return text
+        if tag == _LIST:
+            value = self.value
+            return [value() for _ in range(self.varint())]
+        if tag == _INT:
+            n = self.varint()
+            return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+        if tag == _DICT:
+            value = self.value
+            result = {}
+            for _ in range(self.varint()):
+                key = value()
+                # The encoder only writes string keys; anything else (even unhashable) is corrupt
+                if type(key) is not str:
+                    raise CodecError(f"Dictionary key must be a string, got {type(key).__name__}")
+                result[key] = value()
+            return result
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.raw(_DOUBLE.size))[0]
+        if tag == _BYTES:
+            return bytes(self.raw(self.varint()))
+        raise CodecError(f"Unknown value tag {tag}")
+
+    def datetime(self) -> datetime:
+        aware = self.byte()
+        offset = self.value() if aware else None
+        value = _EPOCH + timedelta(microseconds=_INT64.unpack(self.raw(_INT64.size))[0])
+        if offset is None:
+            return value
+        tz = timezone(timedelta(seconds=offset))
+        return (value + timedelta(seconds=offset)).replace(tzinfo=tz)
+
+
+def _decode(data: bytes, kind: int, read):
+    """Run `read` over a decoder, reporting truncated or corrupt input as CodecError."""
+    decoder = _Decoder(data, kind)
+    try:
+        return read(decoder)
+    except (IndexError, ValueError) as e:
+        if isinstance(e, CodecError):
+            raise
+        raise CodecError(f"Corrupt or truncated record: {e}") from None
+    except RecursionError:
+        raise CodecError("Record is nested too deeply") from None
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode a JSON-like value (plus bytes) as a standalone record."""
+    encoder = _Encoder(KIND_VALUE)
+    encoder.value(value)
+    return bytes(encoder.buffer)
+
+
+def decode_value(data: bytes) -> Any:
+    """Decode a record produced by encode_value()."""
+    return _decode(data, KIND_VALUE, _Decoder.value)
+
+
+def encode_message(message: Message) -> bytes:
+    """Encode a Message, including its type, priority, tenant and timestamp."""
+    encoder = _Encoder(KIND_MESSAGE)
+    encoder.buffer.append(_MESSAGE_TYPE_INDEX[message.message_type])
+    encoder.buffer.append(int(message.priority))
+    encoder.string(message.sender)
+    encoder.string(message.receiver)
+    encoder.string(message.conversation_id)
+    encoder.string(message.tenant)
+    encoder.value(message.reply_to)
+    encoder.datetime(message.timestamp)
+    encoder.value(message.content)
+    return bytes(encoder.buffer)
+
+
+def decode_message(data: bytes) -> Message:
+    """Decode a record produced by encode_message()."""
+    return _decode(data, KIND_MESSAGE, _read_message)
+
+
+def _read_message(decoder: _Decoder) -> Message:
+    message_type = _MESSAGE_TYPES[decoder.byte()]
+    priority = MessagePriority(decoder.byte())
+    sender = decoder.value()
+    receiver = decoder.value()
+    conversation_id = decoder.value()
+    tenant = decoder.value()
+    reply_to = decoder.value()
+    timestamp = decoder.datetime()
+    return Message(
+        sender=sender,
+        receiver=receiver,
+        message_type=message_type,
+        content=decoder.value(),
+        timestamp=timestamp,
+        conversation_id=conversation_id,
+        reply_to=reply_to,
+        priority=priority,
+        tenant=tenant
+    )
+
+
+def encode_product(product: ProductModel) -> bytes:
+    """Encode a ProductModel with its fields in declaration order."""
+    encoder = _Encoder(KIND_PRODUCT)
+    encoder.string(product.name)
+    encoder.string(product.concentration)
+    encoder.value(product.skin_type)
+    encoder.value(product.key_ingredients)
+    encoder.value(product.benefits)
+    encoder.string(product.usage)
+    encoder.string(product.side_effects)
+    encoder.value(product.price)
+    return bytes(encoder.buffer)
+
+
+def decode_product(data: bytes) -> ProductModel:
+    """Decode a record produced by encode_product()."""
+    return _decode(data, KIND_PRODUCT, _read_product)
+
+
+def _read_product(decoder: _Decoder) -> ProductModel:
+    return ProductModel(
+        name=decoder.value(),
+        concentration=decoder.value(),
+        skin_type=decoder.value(),
+        key_ingredients=decoder.value(),
+        benefits=decoder.value(),
+        usage=decoder.value(),
+        side_effects=decoder.value(),
+        price=decoder.value()
+    )
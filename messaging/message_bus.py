@@ -1,51 +1,110 @@
-from queue import Queue, Empty
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from threading import Lock
+from messaging.agent_queue import AgentQueue
 from messaging.message_types import Message
 
 class MessageBus:
-    """Central message broker for agent communication."""
+    """Central message broker for agent communication.
 
-    def __init__(self):
-        self._queues: Dict[str, Queue] = {}
-        self._lock = Lock()
+    Every agent has its own AgentQueue with its own lock, so sends to
+    different agents never contend. The agent registry is copy-on-write:
+    registration builds a new dict and swaps it in, so sends, receives and
+    broadcasts read a stable snapshot without taking any bus-wide lock.
+    """
+
+    def __init__(self, tenant_weights: Dict[str, float] = None):
+        self._queues: Dict[str, AgentQueue] = {}
+        # Shared by every agent queue; tenants not listed have weight 1
+        self.tenant_weights: Dict[str, float] = dict(tenant_weights or {})
+        # Serializes registrations only; readers never take it
+        self._register_lock = Lock()
 
     def register_agent(self, agent_id: str):
         """Register an agent with the message bus."""
-        with self._lock:
+        with self._register_lock:
             if agent_id not in self._queues:
-                self._queues[agent_id] = Queue()
+                queues = dict(self._queues)
+                queues[agent_id] = AgentQueue(tenant_weights=self.tenant_weights)
+                self._queues = queues
                 print(f"[MessageBus] Registered agent: {agent_id}")
 
+    def unregister_agent(self, agent_id: str):
+        """Remove an agent's queue; messages still queued for it are dropped."""
+        with self._register_lock:
+            if agent_id in self._queues:
+                queues = dict(self._queues)
+                del queues[agent_id]
+                self._queues = queues
+
     def send_message(self, message: Message):
         """Send message to target agent."""
-        if message.receiver in self._queues:
-            self._queues[message.receiver].put(message)
+        queue = self._queues.get(message.receiver)
+        if queue is not None:
+            queue.put(message)
         else:
             print(f"[MessageBus] Warning: Agent {message.receiver} not registered")
 
-    def receive_message(self, agent_id: str, timeout=1) -> Message:
-        """Receive message for agent (blocking with timeout)."""
-        if agent_id in self._queues:
-            try:
-                return self._queues[agent_id].get(timeout=timeout)
-            except Empty:
-                return None
+    def receive_message(self, agent_id: str, timeout: Optional[float] = 1,
+                        cancelled: Callable[[], bool] = None) -> Optional[Message]:
+        """Receive message for agent.
+
+        Blocks until a message arrives or the timeout expires; timeout=None
+        blocks until a message arrives or wake() is called for the agent.
+        """
+        queue = self._queues.get(agent_id)
+        if queue is not None:
+            return queue.get(timeout=timeout, cancelled=cancelled)
         return None
 
+    def wake(self, agent_id: str):
+        """Wake every reader blocked on the agent's queue without delivering a message."""
+        queue = self._queues.get(agent_id)
+        if queue is not None:
+            queue.wake()
+
+    def wake_cancelled(self, agent_id: str):
+        """Wake only the readers of the agent's queue whose `cancelled` check now returns true."""
+        queue = self._queues.get(agent_id)
+        if queue is not None:
+            queue.wake_cancelled()
+
+    def queue_depth(self, agent_id: str) -> int:
+        """Number of messages waiting for an agent."""
+        queue = self._queues.get(agent_id)
+        return queue.qsize() if queue is not None else 0
+
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Give a tenant `weight` times the default share of every agent queue."""
+        if weight <= 0:
+            raise ValueError("Tenant weight must be positive")
+        self.tenant_weights[tenant] = weight
+
+    def tenant_stats(self, agent_id: str) -> Dict[str, dict]:
+        """Per-tenant queued count, messages served and queue wait for an agent."""
+        queue = self._queues.get(agent_id)
+        return queue.tenant_stats() if queue is not None else {}
+
+    def purge(self, conversation_id: str) -> int:
+        """Discard every queued message of a conversation; returns how many."""
+        return sum(queue.discard(conversation_id) for queue in self._queues.values())
+
     def broadcast(self, message: Message, exclude: List[str] = None):
-        """Broadcast message to all agents except excluded."""
-        exclude = exclude or []
-        with self._lock:
-            for agent_id in self._queues.keys():
-                if agent_id not in exclude:
-                    msg_copy = Message(
-                        sender=message.sender,
-                        receiver=agent_id,
-                        message_type=message.message_type,
-                        content=message.content,
-                        timestamp=message.timestamp,
-                        conversation_id=message.conversation_id,
-                        reply_to=message.reply_to
-                    )
-                    self.send_message(msg_copy)
+        """Broadcast message to all agents except excluded.
+
+        Delivers to the registry snapshot taken at the start of the call;
+        each recipient's queue is locked only for its own put.
+        """
+        exclude = exclude or ()
+        for agent_id, queue in self._queues.items():
+            if agent_id not in exclude:
+                queue.put(Message(
+                    sender=message.sender,
+                    receiver=agent_id,
+                    message_type=message.message_type,
+                    content=message.content,
+                    timestamp=message.timestamp,
+                    conversation_id=message.conversation_id,
+                    reply_to=message.reply_to,
+                    priority=message.priority,
+                    tenant=message.tenant
+                ))
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Any, Optional
 from datetime import datetime
-from enum import Enum
+from enum import Enum, IntEnum
 
 class MessageType(Enum):
     """Types of messages agents can exchange."""
@@ -11,6 +11,20 @@ class MessageType(Enum):
     QUERY = "query"
     COMPLETE = "complete"
     ERROR = "error"
+    CONTROL = "control"
+
+class MessagePriority(IntEnum):
+    """Dispatch priority; agent queues serve higher values first.
+
+    Priority only orders messages waiting in the same agent queue, so it
+    takes effect between conversations that share a MessageBus and its
+    agents (e.g. several submit() calls on one orchestrator). Each
+    orchestrator builds a private bus unless one is passed in, so runs on
+    different orchestrators never compete for a queue.
+    """
+    BULK = 0
+    NORMAL = 1
+    INTERACTIVE = 2
 
 @dataclass
 class Message:
@@ -22,7 +36,39 @@ class Message:
     timestamp: datetime
     conversation_id: str
     reply_to: Optional[str] = None
+    priority: MessagePriority = MessagePriority.NORMAL
+    # Brand or customer the work belongs to; agent queues share capacity fairly between tenants
+    tenant: str = "default"
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
+
+    def to_dict(self) -> dict:
+        """Convert Message to a JSON-compatible dictionary."""
+        return {
+            "sender": self.sender,
+            "receiver": self.receiver,
+            "message_type": self.message_type.value,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "conversation_id": self.conversation_id,
+            "reply_to": self.reply_to,
+            "priority": int(self.priority),
+            "tenant": self.tenant
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create Message from dictionary produced by to_dict()."""
+        return cls(
+            sender=data["sender"],
+            receiver=data["receiver"],
+            message_type=MessageType(data["message_type"]),
+            content=data["content"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            conversation_id=data["conversation_id"],
+            reply_to=data.get("reply_to"),
+            priority=MessagePriority(data.get("priority", MessagePriority.NORMAL)),
+            tenant=data.get("tenant", "default")
+        )
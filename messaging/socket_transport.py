@@ -0,0 +1,320 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from threading import local
+from messaging import codec
+from messaging.message_bus import MessageBus
+from messaging.message_types import Message
+import json
+import socket
+import socketserver
+import struct
+
+# Every frame is a 4-byte big-endian payload length followed by the payload
+_FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class WireFormat(NamedTuple):
+    """How request/response payloads and the messages inside them are serialized."""
+    encode_value: Callable[[Any], bytes]
+    decode_value: Callable[[bytes], Any]
+    encode_message: Callable[[Message], Any]
+    decode_message: Callable[[Any], Message]
+
+
+def _json_encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# JSON is the default: its C encoder is faster end to end. The binary codec
+# makes frames 2-3x smaller, which pays off on slow links (see
+# benchmarks/codec_benchmark.py). The server answers each frame in the format
+# it arrived in, so clients of both formats can share one bus.
+WIRE_FORMATS: Dict[str, WireFormat] = {
+    "json": WireFormat(_json_encode, json.loads, Message.to_dict, Message.from_dict),
+    "codec": WireFormat(codec.encode_value, codec.decode_value, codec.encode_message, codec.decode_message),
+}
+
+
+def _frame_format(frame: bytes) -> WireFormat:
+    return WIRE_FORMATS["codec" if frame[:len(codec.MAGIC)] == codec.MAGIC else "json"]
+
+
+def parse_address(address: str):
+    """Parse 'host:port' into a TCP address or 'unix:/path' into a socket path."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def send_frame(sock: socket.socket, payload: bytes):
+    """Write one length-prefixed frame."""
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """Read one length-prefixed frame; None if the peer closed the connection."""
+    header = _recv_exact(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = _FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Frame of {length} bytes exceeds limit")
+    return _recv_exact(sock, length)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            if buffer:
+                raise ConnectionError("Connection closed mid-frame")
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class _BusRequestHandler(socketserver.BaseRequestHandler):
+    """Serves bus operations for one client connection until it closes."""
+
+    def handle(self):
+        bus: MessageBus = self.server.bus
+        while True:
+            try:
+                frame = recv_frame(self.request)
+                if frame is None:
+                    return
+                wire = _frame_format(frame)
+                request = wire.decode_value(frame)
+            # Malformed JSON (including over-deep nesting) and codec records alike drop the client
+            except (ConnectionError, OSError, ValueError, RecursionError):
+                return
+            result = None
+            try:
+                result = self._dispatch(bus, request, wire)
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+
+            try:
+                send_frame(self.request, wire.encode_value(response))
+            except OSError:
+                if request.get("op") == "receive" and result is not None:
+                    # The message left the queue but never reached the agent; hand it to another reader
+                    bus.send_message(wire.decode_message(result))
+                return
+
+    def _dispatch(self, bus: MessageBus, request: dict, wire: WireFormat):
+        op = request["op"]
+        if op == "register":
+            bus.register_agent(request["agent_id"])
+        elif op == "unregister":
+            bus.unregister_agent(request["agent_id"])
+        elif op == "send":
+            bus.send_message(wire.decode_message(request["message"]))
+        elif op == "receive":
+            message = bus.receive_message(request["agent_id"], timeout=request["timeout"])
+            return wire.encode_message(message) if message else None
+        elif op == "broadcast":
+            bus.broadcast(wire.decode_message(request["message"]), exclude=request.get("exclude"))
+        elif op == "wake":
+            bus.wake(request["agent_id"])
+        elif op == "purge":
+            return bus.purge(request["conversation_id"])
+        elif op == "depth":
+            return bus.queue_depth(request["agent_id"])
+        elif op == "tenant_weight":
+            bus.set_tenant_weight(request["tenant"], request["weight"])
+        elif op == "tenant_weights":
+            return dict(bus.tenant_weights)
+        elif op == "tenant_stats":
+            return bus.tenant_stats(request["agent_id"])
+        else:
+            raise ValueError(f"Unknown bus operation: {op}")
+        return None
+
+
+class _ThreadingTCPBusServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _ThreadingUnixBusServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class SocketBusServer:
+    """Exposes a local MessageBus to agents in other processes or on other hosts."""
+
+    def __init__(self, address: str, bus: MessageBus = None):
+        self.bus = bus or MessageBus()
+        family, bind_address = parse_address(address)
+        server_class = _ThreadingUnixBusServer if family == socket.AF_UNIX else _ThreadingTCPBusServer
+        self._server = server_class(bind_address, _BusRequestHandler)
+        self._server.bus = self.bus
+
+    @property
+    def address(self) -> str:
+        """Address clients should connect to (resolves an ephemeral port)."""
+        if isinstance(self._server.server_address, tuple):
+            host, port = self._server.server_address[:2]
+            return f"{host}:{port}"
+        return f"unix:{self._server.server_address}"
+
+    def serve_forever(self):
+        print(f"[SocketBusServer] Serving message bus on {self.address}")
+        self._server.serve_forever()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Operations that leave the bus in the same state when repeated, so a
+# request lost with a dropped connection can safely be sent again
+_IDEMPOTENT_OPS = frozenset({"register", "unregister", "wake", "depth", "tenant_weight",
+                             "tenant_weights", "tenant_stats"})
+
+
+class SocketMessageBus:
+    """MessageBus client speaking length-prefixed frames to a SocketBusServer.
+
+    Offers the same API as MessageBus. Each thread keeps one persistent
+    connection that is reused for all of its calls, so a thread blocked in
+    receive_message never holds up senders on other threads. `wire_format`
+    is "json" (default) or "codec" for the compact binary codec.
+    """
+
+    def __init__(self, address: str, connect_timeout: float = 5.0, cancel_check_interval: float = 30.0,
+                 wire_format: str = "json"):
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format {wire_format!r}; expected one of {', '.join(WIRE_FORMATS)}")
+        self.address = address
+        self.wire_format = wire_format
+        self._wire = WIRE_FORMATS[wire_format]
+        self.connect_timeout = connect_timeout
+        # Remote waits cannot evaluate a local `cancelled` callback, so
+        # cancellable receives re-check it at this interval as a backstop to wake()
+        self.cancel_check_interval = cancel_check_interval
+        self._local = local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            family, target = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(self.connect_timeout)
+            sock.connect(target)
+            sock.settimeout(None)
+            if family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._local.sock = sock
+        return sock
+
+    def _call(self, request: dict):
+        """Send one request and wait for its response.
+
+        If the link dropped, idempotent operations reconnect and are sent
+        once more. Others (send, broadcast, receive, purge) raise instead,
+        since the server may already have applied them.
+        """
+        payload = self._wire.encode_value(request)
+        attempts = 2 if request["op"] in _IDEMPOTENT_OPS else 1
+        for attempt in range(attempts):
+            sock = self._connection()
+            try:
+                send_frame(sock, payload)
+                frame = recv_frame(sock)
+                if frame is None:
+                    raise ConnectionError("Bus server closed the connection")
+                break
+            except (ConnectionError, OSError):
+                self._close_connection()
+                if attempt == attempts - 1:
+                    raise
+
+        response = self._wire.decode_value(frame)
+        if not response["ok"]:
+            raise RuntimeError(f"Bus error: {response['error']}")
+        return response["result"]
+
+    def _close_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def register_agent(self, agent_id: str):
+        """Register an agent with the remote message bus."""
+        self._call({"op": "register", "agent_id": agent_id})
+
+    def unregister_agent(self, agent_id: str):
+        """Remove an agent's queue from the remote message bus."""
+        self._call({"op": "unregister", "agent_id": agent_id})
+
+    def send_message(self, message: Message):
+        """Send message to target agent."""
+        self._call({"op": "send", "message": self._wire.encode_message(message)})
+
+    def receive_message(self, agent_id: str, timeout: Optional[float] = 1,
+                        cancelled: Callable[[], bool] = None) -> Optional[Message]:
+        """Receive message for agent, with the same blocking semantics as MessageBus."""
+        while True:
+            if cancelled and cancelled():
+                return None
+            wait = timeout
+            if cancelled and (timeout is None or timeout > self.cancel_check_interval):
+                wait = self.cancel_check_interval
+
+            data = self._call({"op": "receive", "agent_id": agent_id, "timeout": wait})
+            if data is not None:
+                return self._wire.decode_message(data)
+            if wait == timeout:
+                return None
+            if timeout is not None:
+                timeout -= wait
+
+    def wake(self, agent_id: str):
+        """Wake every reader blocked on the agent's queue without delivering a message."""
+        self._call({"op": "wake", "agent_id": agent_id})
+
+    def wake_cancelled(self, agent_id: str):
+        """Wake the readers whose `cancelled` check now returns true.
+
+        `cancelled` runs on the client side of the socket, so the server
+        cannot tell readers apart; every reader of the queue is woken and
+        the others simply wait again.
+        """
+        self.wake(agent_id)
+
+    def queue_depth(self, agent_id: str) -> int:
+        """Number of messages waiting for an agent."""
+        return self._call({"op": "depth", "agent_id": agent_id})
+
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Give a tenant `weight` times the default share of every agent queue."""
+        self._call({"op": "tenant_weight", "tenant": tenant, "weight": weight})
+
+    @property
+    def tenant_weights(self) -> Dict[str, float]:
+        """Snapshot of the remote bus's tenant weights; change them with set_tenant_weight()."""
+        return self._call({"op": "tenant_weights"})
+
+    def tenant_stats(self, agent_id: str) -> Dict[str, dict]:
+        """Per-tenant queued count, messages served and queue wait for an agent."""
+        return self._call({"op": "tenant_stats", "agent_id": agent_id})
+
+    def purge(self, conversation_id: str) -> int:
+        """Discard every queued message of a conversation; returns how many."""
+        return self._call({"op": "purge", "conversation_id": conversation_id})
+
+    def broadcast(self, message: Message, exclude: List[str] = None):
+        """Broadcast message to all agents except excluded."""
+        self._call({"op": "broadcast", "message": self._wire.encode_message(message), "exclude": exclude})
+
+    def close(self):
+        """Close this thread's connection."""
+        self._close_connection()
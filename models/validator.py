@@ -0,0 +1,131 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import math
+
+# Field rules for raw product records. Supported keys: type, required,
+# min_length (strings), items and min_items (lists), min and exclusive_min (numbers).
+# Float fields never accept nan or infinity.
+PRODUCT_SCHEMA: Dict[str, dict] = {
+    "name": {"type": str, "required": True, "min_length": 1},
+    "concentration": {"type": str, "required": True},
+    "skin_type": {"type": list, "required": True, "items": str, "min_items": 1},
+    "key_ingredients": {"type": list, "required": True, "items": str, "min_items": 1},
+    "benefits": {"type": list, "required": True, "items": str, "min_items": 1},
+    "usage": {"type": str, "required": True},
+    "side_effects": {"type": str, "required": True},
+    "price": {"type": (int, float), "required": True, "exclusive_min": 0},
+}
+
+Check = Callable[[Any], Optional[str]]
+
+
+class ValidationError(ValueError):
+    """Raised when a record fails validation; carries every error found."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class CompiledValidator:
+    """Schema compiled once into per-field check functions.
+
+    validate() collects every error in a record instead of stopping at the
+    first one, and validate_batch() checks many records in a single call.
+    """
+
+    def __init__(self, schema: Dict[str, dict]):
+        self.schema = schema
+        self._required = tuple(field for field, rules in schema.items() if rules.get("required"))
+        self._checks: Tuple[Tuple[str, Tuple[Check, ...]], ...] = tuple(
+            (field, self._compile_field(field, rules)) for field, rules in schema.items()
+        )
+
+    def _compile_field(self, field: str, rules: dict) -> Tuple[Check, ...]:
+        checks: List[Check] = []
+        expected = rules.get("type")
+
+        if expected is not None:
+            type_name = " or ".join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+
+            def check_type(value, expected=expected, type_name=type_name):
+                # bool is an int subclass but never a valid number here
+                if not isinstance(value, expected) or isinstance(value, bool):
+                    return f"{field}: expected {type_name}, got {type(value).__name__}"
+            checks.append(check_type)
+
+            if float in (expected if isinstance(expected, tuple) else (expected,)):
+                def check_finite(value):
+                    # nan slips past every comparison and inf past any minimum
+                    if isinstance(value, float) and not math.isfinite(value):
+                        return f"{field}: must be a finite number"
+                checks.append(check_finite)
+
+        if "min_length" in rules:
+            def check_min_length(value, minimum=rules["min_length"]):
+                if isinstance(value, str) and len(value.strip()) < minimum:
+                    return f"{field}: must not be empty"
+            checks.append(check_min_length)
+
+        if "min_items" in rules:
+            def check_min_items(value, minimum=rules["min_items"]):
+                if isinstance(value, list) and len(value) < minimum:
+                    return f"{field}: needs at least {minimum} item(s)"
+            checks.append(check_min_items)
+
+        if "items" in rules:
+            def check_items(value, item_type=rules["items"]):
+                if isinstance(value, list):
+                    for i, item in enumerate(value):
+                        if not isinstance(item, item_type):
+                            return f"{field}[{i}]: expected {item_type.__name__}, got {type(item).__name__}"
+            checks.append(check_items)
+
+        if "min" in rules or "exclusive_min" in rules:
+            def check_min(value, minimum=rules.get("min"), exclusive=rules.get("exclusive_min")):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if minimum is not None and value < minimum:
+                        return f"{field}: must be at least {minimum}"
+                    if exclusive is not None and value <= exclusive:
+                        return f"{field}: must be greater than {exclusive}"
+            checks.append(check_min)
+
+        return tuple(checks)
+
+    def validate(self, record: Any) -> List[str]:
+        """Return every error in the record; an empty list means it is valid."""
+        if not isinstance(record, dict):
+            return [f"record: expected object, got {type(record).__name__}"]
+
+        errors = [f"{field}: required field missing" for field in self._required if field not in record]
+        for field, checks in self._checks:
+            if field not in record:
+                continue
+            value = record[field]
+            for check in checks:
+                error = check(value)
+                if error:
+                    errors.append(error)
+                    break
+        return errors
+
+    def validate_batch(self, records: List[Any]) -> Tuple[List[Any], List[Tuple[int, Any, List[str]]]]:
+        """Split records into valid ones and (index, record, errors) rejects."""
+        valid = []
+        rejects = []
+        validate = self.validate
+        for index, record in enumerate(records):
+            errors = validate(record)
+            if errors:
+                rejects.append((index, record, errors))
+            else:
+                valid.append(record)
+        return valid, rejects
+
+    def check(self, record: Any):
+        """Raise ValidationError listing every problem if the record is invalid."""
+        errors = self.validate(record)
+        if errors:
+            raise ValidationError(errors)
+
+
+PRODUCT_VALIDATOR = CompiledValidator(PRODUCT_SCHEMA)
@@ -0,0 +1,191 @@
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+from agents.base_agent import BaseAgent
+from messaging.message_bus import MessageBus
+import time
+
+
+@dataclass
+class WorkerPool:
+    """Running workers for one agent id plus the autoscaler's sampling state."""
+    agent_id: str
+    factory: Callable[[], BaseAgent]
+    min_workers: int
+    max_workers: int
+    workers: List[BaseAgent] = field(default_factory=list)
+    # Workers being stopped outside the autoscaler lock, still counted in `processed`
+    retiring: List[BaseAgent] = field(default_factory=list)
+    # Messages handled by workers that have since been retired
+    retired_processed: int = 0
+    last_processed: int = 0
+    last_depth: int = 0
+    rate: float = 0.0
+    # Messages arriving per second: those processed plus the queue's growth
+    arrival_rate: float = 0.0
+    busy_samples: int = 0
+    idle_samples: int = 0
+    last_change: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return (self.retired_processed + sum(worker.processed for worker in self.workers)
+                + sum(worker.processed for worker in self.retiring))
+
+
+class AgentAutoscaler:
+    """Grows and shrinks the set of workers serving each agent id.
+
+    Workers of one agent id share its MessageBus queue, so adding one adds
+    capacity immediately and retiring one only stops that worker after its
+    in-flight message. Every `interval` seconds each pool is sampled for
+    queue depth, processing rate and arrival rate (messages processed plus
+    the queue's growth):
+
+    - a pool scales up by one worker when, for `up_samples` consecutive
+      samples, either the backlog per worker is at least `scale_up_backlog`
+      or messages arrive faster than `arrival_ratio` times the processing
+      rate, so a queue that keeps growing gets help before it is deep;
+    - it scales down by one when, for `down_samples` consecutive samples,
+      the queue is at most `scale_down_backlog` deep and not growing
+      (arrivals are processed as fast as they come).
+
+    The gap between the two thresholds, the consecutive-sample requirement
+    and a `cooldown` after every change keep the pool from thrashing.
+    Decisions are printed and kept in `decisions`.
+    """
+
+    def __init__(self, message_bus: MessageBus, interval: float = 0.5,
+                 scale_up_backlog: int = 8, scale_down_backlog: int = 0,
+                 up_samples: int = 2, down_samples: int = 10, cooldown: float = 2.0,
+                 arrival_ratio: float = 1.2):
+        self.message_bus = message_bus
+        self.interval = interval
+        self.scale_up_backlog = scale_up_backlog
+        self.scale_down_backlog = scale_down_backlog
+        self.up_samples = up_samples
+        self.down_samples = down_samples
+        self.cooldown = cooldown
+        self.arrival_ratio = arrival_ratio
+        self.pools: Dict[str, WorkerPool] = {}
+        # (time, agent_id, previous workers, workers, queue depth, processing rate, arrival rate)
+        self.decisions: List[Tuple[float, str, int, int, int, float, float]] = []
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+        self._last_sample = time.monotonic()
+
+    def manage(self, agent: BaseAgent, factory: Callable[[], BaseAgent],
+               min_workers: int = 1, max_workers: int = 4):
+        """Put a running agent under autoscaling; factory builds extra workers for its agent id."""
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError("Worker bounds must satisfy 1 <= min_workers <= max_workers")
+        pool = WorkerPool(agent.agent_id, factory, min_workers, max_workers, workers=[agent])
+        pool.last_processed = pool.processed
+        pool.last_depth = self.message_bus.queue_depth(agent.agent_id)
+        with self._lock:
+            self.pools[agent.agent_id] = pool
+            while len(pool.workers) < min_workers:
+                self._add_worker(pool)
+
+    def start(self):
+        """Start sampling queues in a background thread."""
+        self._stopped.clear()
+        self._last_sample = time.monotonic()
+        self._thread = Thread(target=self._run, name="autoscaler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and retire every worker the autoscaler added."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        retiring = []
+        with self._lock:
+            for pool in self.pools.values():
+                while len(pool.workers) > 1:
+                    retiring.append((pool, self._detach_worker(pool)))
+        # Signal every worker first so their in-flight messages finish in parallel
+        for _, worker in retiring:
+            worker.request_stop()
+        for pool, worker in retiring:
+            self._finish_retirement(pool, worker)
+
+    def worker_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {agent_id: len(pool.workers) for agent_id, pool in self.pools.items()}
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Take one sample of every pool and apply any scaling decision."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_sample, 1e-9)
+        self._last_sample = now
+        retiring = []
+
+        with self._lock:
+            for pool in self.pools.values():
+                depth = self.message_bus.queue_depth(pool.agent_id)
+                processed = pool.processed
+                handled = processed - pool.last_processed
+                pool.rate = handled / elapsed
+                pool.arrival_rate = max(0, handled + depth - pool.last_depth) / elapsed
+                pool.last_processed = processed
+                pool.last_depth = depth
+
+                workers = len(pool.workers)
+                # A growing queue means the workers fall behind, however shallow it still is
+                falling_behind = depth > self.scale_down_backlog and pool.arrival_rate > pool.rate * self.arrival_ratio
+                if depth >= self.scale_up_backlog * workers or falling_behind:
+                    pool.busy_samples += 1
+                    pool.idle_samples = 0
+                elif depth <= self.scale_down_backlog and pool.arrival_rate <= pool.rate:
+                    pool.idle_samples += 1
+                    pool.busy_samples = 0
+                else:
+                    pool.busy_samples = pool.idle_samples = 0
+
+                if now - pool.last_change < self.cooldown:
+                    continue
+                if pool.busy_samples >= self.up_samples and workers < pool.max_workers:
+                    self._add_worker(pool)
+                elif pool.idle_samples >= self.down_samples and workers > pool.min_workers:
+                    retiring.append((pool, self._detach_worker(pool)))
+                else:
+                    continue
+
+                pool.busy_samples = pool.idle_samples = 0
+                pool.last_change = now
+                self._log_decision(pool, workers, depth)
+
+        # Stopping joins the worker's thread; doing it under the lock would stall every other decision
+        for pool, worker in retiring:
+            self._finish_retirement(pool, worker)
+
+    def _add_worker(self, pool: WorkerPool):
+        worker = pool.factory()
+        worker.start()
+        pool.workers.append(worker)
+
+    def _detach_worker(self, pool: WorkerPool) -> BaseAgent:
+        """Take a worker out of service; the caller holds the lock and stops it afterwards."""
+        worker = pool.workers.pop()
+        pool.retiring.append(worker)
+        return worker
+
+    def _finish_retirement(self, pool: WorkerPool, worker: BaseAgent):
+        """Stop a detached worker without the lock, then fold its message count into the pool."""
+        worker.stop()
+        with self._lock:
+            pool.retiring.remove(worker)
+            pool.retired_processed += worker.processed
+
+    def _log_decision(self, pool: WorkerPool, previous: int, depth: int):
+        workers = len(pool.workers)
+        self.decisions.append((time.time(), pool.agent_id, previous, workers, depth, pool.rate, pool.arrival_rate))
+        direction = "up" if workers > previous else "down"
+        print(f"[autoscaler] Scaled {pool.agent_id} {direction}: {previous} -> {workers} workers "
+              f"(queue depth {depth}, {pool.arrival_rate:.1f} msg/s in, {pool.rate:.1f} msg/s out)")
@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from threading import Event
+from typing import Any, Dict, Optional
+from messaging.message_types import MessagePriority
+from orchestrator.pipeline_profile import FULL_PROFILE, PipelineProfile
+from orchestrator.state_machine import StateMachine
+import time
+
+@dataclass
+class Conversation:
+    """State of one product moving through the pipeline."""
+    conversation_id: str
+    priority: MessagePriority = MessagePriority.NORMAL
+    tenant: str = "default"
+    profile: PipelineProfile = FULL_PROFILE
+    deadline: Optional[float] = None
+    state_machine: StateMachine = field(default_factory=StateMachine)
+    workflow_data: Dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    stage_deadline: Optional[float] = None
+    retry_at: Optional[float] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    # Set once the conversation completes, fails or is cancelled
+    done: Event = field(default_factory=Event, repr=False, compare=False)
+
+    @property
+    def state(self):
+        return self.state_machine.current_state
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Seconds from submission to completion, failure or cancellation."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def next_timer(self) -> Optional[float]:
+        """Earliest monotonic time at which this conversation needs attention."""
+        timers = [t for t in (self.deadline, self.stage_deadline, self.retry_at) if t is not None]
+        return min(timers) if timers else None
+
+    def results(self) -> dict:
+        """Generated pages of the conversation's profile, keyed by page name."""
+        return {page: self.workflow_data.get(page) for page in self.profile.page_order}
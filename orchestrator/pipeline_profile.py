@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Tuple, Union
+from orchestrator.state_machine import PAGE_STAGES, SystemState, stages_for
+
+@dataclass(frozen=True)
+class PipelineProfile:
+    """Named set of pages a run produces, and the minimal stages behind them."""
+    name: str
+    pages: FrozenSet[str]
+
+    @property
+    def stages(self) -> Tuple[SystemState, ...]:
+        return stages_for(self.pages)
+
+    @property
+    def page_order(self) -> Tuple[str, ...]:
+        """The profile's pages in pipeline order."""
+        return tuple(page for page in PAGE_STAGES if page in self.pages)
+
+
+def _profile(name: str, *pages: str) -> PipelineProfile:
+    return PipelineProfile(name, frozenset(pages))
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        _profile("full", *PAGE_STAGES),
+        _profile("faq", "faq_page"),
+        _profile("product_page", "product_page"),
+        _profile("comparison", "comparison_page"),
+        # Job-shaped aliases: price changes only touch the product page,
+        # a new competitor only changes comparisons
+        _profile("price_refresh", "product_page"),
+        _profile("new_competitor", "comparison_page"),
+    )
+}
+FULL_PROFILE = PROFILES["full"]
+
+# Anything resolve_profile() accepts
+ProfileSpec = Union[str, PipelineProfile, Iterable[str], None]
+
+
+def resolve_profile(profile: ProfileSpec) -> PipelineProfile:
+    """A PipelineProfile from a profile, a profile name, a comma-separated page list or an iterable of pages.
+
+    None means the full pipeline. Unknown names and pages raise ValueError.
+    """
+    if profile is None:
+        return FULL_PROFILE
+    if isinstance(profile, PipelineProfile):
+        return profile
+    if isinstance(profile, str):
+        if profile in PROFILES:
+            return PROFILES[profile]
+        pages = [page.strip() for page in profile.split(",") if page.strip()]
+        name = profile
+    else:
+        pages = list(profile)
+        name = ",".join(pages)
+    if not pages:
+        raise ValueError("A pipeline profile needs at least one page")
+    # Validates the page names
+    stages_for(pages)
+    return PipelineProfile(name, frozenset(pages))
@@ -0,0 +1,216 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from catalog.reader import jsonl_ranges
+from llm.backend import TextBackend
+from orchestrator.pipeline_profile import ProfileSpec
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+
+def run_sharded(catalogs: Dict[str, str], workers: int, reject_paths: Dict[str, str],
+                output_dir: str = "output", sqlite_path: Optional[str] = None,
+                max_in_flight: int = 32, tenant_weights: Dict[str, float] = None,
+                profile: ProfileSpec = None, max_workers: int = 1,
+                text_backend: Optional[TextBackend] = None) -> dict:
+    """Generate pages for tenant catalogs across `workers` processes.
+
+    Each catalog is split into `workers` contiguous byte ranges of JSONL
+    lines, and each process parses and validates only its own range before
+    running it through its own WorkflowOrchestrator and agents. Generation
+    is therefore not serialized by one interpreter's GIL, and parsing is
+    split rather than repeated. JSON and CSV catalogs are first converted
+    to a temporary JSONL file in the parent, so they are parsed twice.
+
+    Each process writes its own reject file and its own pages: a database
+    file with SQLite output, otherwise a private staging directory under
+    `output_dir`. The parent merges all of them in catalog order, so when a
+    product name repeats across shards, the later record wins as in a
+    single-process run.
+
+    Shards honour `profile` and autoscale their agents up to
+    `max_workers`. With a picklable `text_backend`, each shard wraps it in
+    its own TextClient. Returns the merged latency report with per-tenant
+    reports under "tenants".
+    """
+    started = time.monotonic()
+    for base in filter(None, [sqlite_path, *reject_paths.values()]):
+        _remove_shard_files(base)
+    if not sqlite_path:
+        for path in glob.glob(os.path.join(glob.escape(output_dir), ".shard-*")):
+            shutil.rmtree(path)
+
+    spilled = []
+    try:
+        sources = {}
+        for tenant, path in catalogs.items():
+            if os.path.splitext(path)[1].lower() not in (".jsonl", ".ndjson"):
+                path = _spill_to_jsonl(path)
+                spilled.append(path)
+            sources[tenant] = (path, jsonl_ranges(path, workers))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_shard, shard, {tenant: (path, ranges[shard]) for tenant, (path, ranges) in sources.items()},
+                            reject_paths, output_dir, sqlite_path, max_in_flight, tenant_weights or {},
+                            profile, max_workers, text_backend)
+                for shard in range(workers)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        for path in spilled:
+            os.remove(path)
+    elapsed = time.monotonic() - started
+
+    for tenant, reject_path in reject_paths.items():
+        with open(reject_path, "wb") as merged:
+            for result in results:
+                with open(result["reject_paths"][tenant], "rb") as part:
+                    shutil.copyfileobj(part, merged)
+                os.remove(result["reject_paths"][tenant])
+
+    if sqlite_path:
+        from storage.sqlite_sink import SQLiteOutputSink
+        sink = SQLiteOutputSink(sqlite_path)
+        for result in results:
+            sink.merge(result["sqlite_path"])
+            _remove_sqlite(result["sqlite_path"])
+        sink.close()
+    else:
+        for result in results:
+            _merge_output_dir(result["output_dir"], output_dir)
+
+    report = _merge_reports(results, elapsed)
+    print(f"[ShardedRunner] {workers} process(es) finished in {elapsed:.2f}s: "
+          f"{ {k: v for k, v in report.items() if k != 'tenants'} }")
+    return report
+
+
+def _shard_path(base: str, shard: int) -> str:
+    return f"{base}.shard-{shard}"
+
+
+def _merge_output_dir(shard_dir: str, output_dir: str):
+    """Move a shard's per-product page files into `output_dir`, replacing earlier versions."""
+    for product_dir in sorted(os.listdir(shard_dir)):
+        target = os.path.join(output_dir, product_dir)
+        os.makedirs(target, exist_ok=True)
+        for filename in os.listdir(os.path.join(shard_dir, product_dir)):
+            os.replace(os.path.join(shard_dir, product_dir, filename), os.path.join(target, filename))
+    shutil.rmtree(shard_dir)
+
+
+def _remove_sqlite(path: str):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _remove_shard_files(base: str):
+    """Delete shard files a crashed earlier run left behind, so they are never merged."""
+    for path in glob.glob(glob.escape(base) + ".shard-*"):
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def _spill_to_jsonl(path: str) -> str:
+    """Copy a JSON or CSV catalog's raw records to a temporary JSONL file, one record per line."""
+    from catalog.reader import iter_products
+    fd, spill_path = tempfile.mkstemp(suffix=".jsonl", prefix="catalog-")
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        for record in iter_products(path):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return spill_path
+
+
+def _run_shard(shard: int, ranges: Dict[str, Tuple[str, Tuple[int, int]]], reject_paths: Dict[str, str],
+               output_dir: str, sqlite_path: Optional[str], max_in_flight: int,
+               tenant_weights: Dict[str, float], profile: ProfileSpec, max_workers: int,
+               text_backend: Optional[TextBackend]) -> dict:
+    """Worker process: run one byte range of every catalog through a private orchestrator."""
+    from catalog.reader import count_jsonl_records, iter_jsonl_range, iter_valid_products
+    from llm.client import TextClient
+    from orchestrator.workflow_orchestrator import WorkflowOrchestrator
+    from storage.output_sink import FileOutputSink
+
+    shard_sqlite = _shard_path(sqlite_path, shard) if sqlite_path else None
+    # Pages are staged per shard so the parent decides which version of a repeated name wins
+    shard_output = None if sqlite_path else os.path.join(output_dir, f".shard-{shard}")
+    if shard_sqlite:
+        from storage.sqlite_sink import SQLiteOutputSink
+        _remove_sqlite(shard_sqlite)
+        sink = SQLiteOutputSink(shard_sqlite)
+    else:
+        os.makedirs(shard_output, exist_ok=True)
+        sink = FileOutputSink(shard_output, per_product=True)
+
+    text_client = TextClient(text_backend) if text_backend is not None else None
+    orchestrator = WorkflowOrchestrator(output_sink=sink, profile=profile, max_workers=max_workers,
+                                        text_client=text_client)
+    for tenant, weight in tenant_weights.items():
+        orchestrator.message_bus.set_tenant_weight(tenant, weight)
+
+    shard_rejects = {tenant: _shard_path(reject_paths[tenant], shard) for tenant in ranges}
+    sources = {}
+    for tenant, (path, (start, end)) in ranges.items():
+        # Reject rows stay positions in the whole catalog
+        sources[tenant] = iter_valid_products(iter_jsonl_range(path, start, end), shard_rejects[tenant],
+                                              first_row=count_jsonl_records(path, start))
+
+    try:
+        orchestrator.run_catalogs(sources, max_in_flight=max_in_flight)
+    finally:
+        orchestrator.shutdown()
+        if text_client:
+            text_client.close()
+        # A tenant whose range was never read still needs its (empty) reject file
+        for reject_path in shard_rejects.values():
+            open(reject_path, "a").close()
+
+    return {
+        "stats": orchestrator.stats,
+        "latencies": orchestrator.latencies.tobytes(),
+        "tenants": {
+            tenant: {
+                "counts": {k: stats[k] for k in ("submitted", "completed", "failed", "cancelled")},
+                "latencies": stats["latencies"].tobytes(),
+            }
+            for tenant, stats in orchestrator.tenants.items()
+        },
+        "sqlite_path": shard_sqlite,
+        "output_dir": shard_output,
+        "reject_paths": shard_rejects,
+    }
+
+
+def _merge_reports(results: List[dict], elapsed: float) -> dict:
+    """Sum shard outcome counts and recompute percentiles over all shards' latencies."""
+    from orchestrator.workflow_orchestrator import _percentiles
+
+    report: Dict[str, object] = {}
+    latencies = array("d")
+    tenants: Dict[str, dict] = {}
+    for result in results:
+        for key, value in result["stats"].items():
+            report[key] = report.get(key, 0) + value
+        latencies.frombytes(result["latencies"])
+        for tenant, shard_report in result["tenants"].items():
+            merged = tenants.setdefault(tenant, {"counts": {}, "latencies": array("d")})
+            for key, value in shard_report["counts"].items():
+                merged["counts"][key] = merged["counts"].get(key, 0) + value
+            merged["latencies"].frombytes(shard_report["latencies"])
+
+    report["throughput"] = round(report.get("completed", 0) / elapsed, 2) if elapsed > 0 else 0.0
+    report.update(_percentiles(latencies))
+    report["tenants"] = {
+        tenant: {
+            **merged["counts"],
+            "throughput": round(merged["counts"].get("completed", 0) / elapsed, 2) if elapsed > 0 else 0.0,
+            **_percentiles(merged["latencies"]),
+        }
+        for tenant, merged in tenants.items()
+    }
+    return report
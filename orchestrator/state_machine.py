@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, Callable
+from typing import Callable, Dict, Iterable, Optional, Tuple
 
 class SystemState(Enum):
     """System states for workflow."""
@@ -11,6 +11,7 @@ class SystemState(Enum):
     GENERATING_COMPARISON = "generating_comparison"
     COMPLETED = "completed"
     ERROR = "error"
+    CANCELLED = "cancelled"
 
 class Event(Enum):
     """Events that trigger state transitions."""
@@ -21,25 +22,71 @@ class Event(Enum):
     PRODUCT_PAGE_GENERATED = "product_page_generated"
     COMPARISON_GENERATED = "comparison_generated"
     ERROR_OCCURRED = "error_occurred"
+    CANCEL = "cancel"
+
+TERMINAL_STATES = (SystemState.COMPLETED, SystemState.ERROR, SystemState.CANCELLED)
+
+# Every stage in pipeline order, with the event that completes it
+PIPELINE_STAGES = (
+    (SystemState.PARSING_DATA, Event.DATA_PARSED),
+    (SystemState.GENERATING_QUESTIONS, Event.QUESTIONS_GENERATED),
+    (SystemState.GENERATING_FAQ, Event.FAQ_GENERATED),
+    (SystemState.GENERATING_PRODUCT_PAGE, Event.PRODUCT_PAGE_GENERATED),
+    (SystemState.GENERATING_COMPARISON, Event.COMPARISON_GENERATED),
+)
+
+# Stages each output page depends on; parsing is needed by all of them
+PAGE_STAGES = {
+    "faq_page": (SystemState.GENERATING_QUESTIONS, SystemState.GENERATING_FAQ),
+    "product_page": (SystemState.GENERATING_PRODUCT_PAGE,),
+    "comparison_page": (SystemState.GENERATING_COMPARISON,),
+}
+
+def stages_for(pages: Iterable[str]) -> Tuple[SystemState, ...]:
+    """Minimal stages, in pipeline order, that produce the given pages."""
+    needed = {SystemState.PARSING_DATA}
+    for page in pages:
+        if page not in PAGE_STAGES:
+            raise ValueError(f"Unknown page '{page}'; expected one of {', '.join(PAGE_STAGES)}")
+        needed.update(PAGE_STAGES[page])
+    return tuple(state for state, _ in PIPELINE_STAGES if state in needed)
 
 class StateMachine:
-    """Finite state machine for workflow coordination."""
+    """Finite state machine for workflow coordination.
 
-    def __init__(self):
+    `stages` limits the workflow to a subset of the pipeline stages (see
+    stages_for()); each stage's completion event then leads straight to
+    the next selected stage. By default every stage runs.
+    """
+
+    def __init__(self, stages: Optional[Iterable[SystemState]] = None):
         self.current_state = SystemState.IDLE
-        self.transitions: Dict[tuple, SystemState] = self._define_transitions()
+        self.transitions: Dict[tuple, SystemState] = self._define_transitions(stages)
         self.state_actions: Dict[SystemState, Callable] = {}
 
-    def _define_transitions(self) -> Dict[tuple, SystemState]:
+    def _define_transitions(self, stages: Optional[Iterable[SystemState]] = None) -> Dict[tuple, SystemState]:
         """Define valid state transitions."""
-        return {
-            (SystemState.IDLE, Event.START_PIPELINE): SystemState.PARSING_DATA,
-            (SystemState.PARSING_DATA, Event.DATA_PARSED): SystemState.GENERATING_QUESTIONS,
-            (SystemState.GENERATING_QUESTIONS, Event.QUESTIONS_GENERATED): SystemState.GENERATING_FAQ,
-            (SystemState.GENERATING_FAQ, Event.FAQ_GENERATED): SystemState.GENERATING_PRODUCT_PAGE,
-            (SystemState.GENERATING_PRODUCT_PAGE, Event.PRODUCT_PAGE_GENERATED): SystemState.GENERATING_COMPARISON,
-            (SystemState.GENERATING_COMPARISON, Event.COMPARISON_GENERATED): SystemState.COMPLETED,
-        }
+        selected = set(stages) if stages is not None else {state for state, _ in PIPELINE_STAGES}
+        transitions = {}
+        previous = (SystemState.IDLE, Event.START_PIPELINE)
+        for state, completed in PIPELINE_STAGES:
+            if state in selected:
+                transitions[previous] = state
+                previous = (state, completed)
+        transitions[previous] = SystemState.COMPLETED
+
+        # Any non-terminal state can fail or be cancelled
+        for state in SystemState:
+            if state not in TERMINAL_STATES:
+                transitions[(state, Event.ERROR_OCCURRED)] = SystemState.ERROR
+                transitions[(state, Event.CANCEL)] = SystemState.CANCELLED
+
+        return transitions
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the workflow has finished, successfully or not."""
+        return self.current_state in TERMINAL_STATES
 
     def trigger(self, event: Event) -> bool:
         """Trigger state transition."""
@@ -1,30 +1,139 @@
 from messaging.message_bus import MessageBus
-from messaging.message_types import Message, MessageType
+from messaging.message_types import Message, MessageType, MessagePriority
+from orchestrator.conversation import Conversation
+from orchestrator.pipeline_profile import ProfileSpec, resolve_profile
 from orchestrator.state_machine import StateMachine, SystemState, Event
 from agents.data_parser_agent import DataParserAgent
 from agents.question_generator_agent import QuestionGeneratorAgent
 from agents.faq_generator_agent import FAQGeneratorAgent
 from agents.product_page_generator_agent import ProductPageGeneratorAgent
 from agents.comparison_agent import ComparisonAgent
+from catalog.columnar_store import ProductRow
+from orchestrator.autoscaler import AgentAutoscaler
+from llm.client import TextClient
+from agents.agent_profiler import AgentProfiler
+from search.page_index import PageIndex
+from storage.async_sink import AsyncOutputSink
+from storage.output_sink import FileOutputSink, OutputSink
+from array import array
+from contextlib import contextmanager
+from threading import Condition, get_ident
+from typing import Dict, Iterable, Optional, Union
 import uuid
-import json
 import time
 
-class WorkflowOrchestrator:
-    """Orchestrator coordinates autonomous agents via message passing."""
+# Agent class behind each agent id, used to build local agents and remote agent processes
+AGENT_CLASSES = {
+    "data_parser": DataParserAgent,
+    "question_generator": QuestionGeneratorAgent,
+    "faq_generator": FAQGeneratorAgent,
+    "product_page_generator": ProductPageGeneratorAgent,
+    "comparison_generator": ComparisonAgent,
+}
+
+# Agents that accept a TextClient for model-generated copy
+TEXT_AGENTS = {"faq_generator", "product_page_generator"}
 
-    def __init__(self):
+# End-of-catalog marker; None is a valid (if invalid-product) catalog element
+_END_OF_CATALOG = object()
+
+class WorkflowOrchestrator:
+    """Orchestrator coordinates autonomous agents via message passing.
+
+    Each submitted product becomes a Conversation with its own state
+    machine, deadline and per-stage timeout. Failed or timed-out stages are
+    retried with exponential backoff; a conversation that runs out of
+    retries or time is failed and its queued messages are discarded.
+    Conversation priorities and tenants order work within this
+    orchestrator's agent queues only; another orchestrator has its own
+    bus and agents. submit() and run_pipeline() are safe to call from any
+    thread while a catalog run is in progress: the new conversation is
+    queued to the running loop, so an INTERACTIVE request overtakes the
+    BULK work already waiting in the same agent queues.
+
+    By default agents share an in-process MessageBus. Pass a
+    SocketMessageBus and list the agent ids hosted by other processes in
+    `remote_agents` to distribute the pipeline.
+
+    A pipeline profile (see orchestrator.pipeline_profile) names the pages
+    to produce; each conversation runs only the stages those pages need,
+    so a product-page refresh never dispatches question or FAQ
+    generation. `profile` sets the default, and submit() and the run
+    methods accept one per conversation or run.
+    """
+
+    # Agent responsible for each pipeline stage
+    STAGE_AGENTS = {
+        SystemState.PARSING_DATA: "data_parser",
+        SystemState.GENERATING_QUESTIONS: "question_generator",
+        SystemState.GENERATING_FAQ: "faq_generator",
+        SystemState.GENERATING_PRODUCT_PAGE: "product_page_generator",
+        SystemState.GENERATING_COMPARISON: "comparison_generator",
+    }
+
+    def __init__(self, output_dir: str = "output", save_outputs: bool = True,
+                 stage_timeout: float = 30.0, conversation_timeout: Optional[float] = 120.0,
+                 max_retries: int = 2, retry_backoff: float = 0.5,
+                 message_bus: MessageBus = None, remote_agents: Iterable[str] = (),
+                 output_sink: OutputSink = None, async_writes: bool = True,
+                 max_workers: int = 1, text_client: TextClient = None,
+                 page_index: PageIndex = None, profile: ProfileSpec = "full"):
         self.orchestrator_id = "orchestrator"
-        self.message_bus = MessageBus()
-        self.state_machine = StateMachine()
-        self.conversation_id = str(uuid.uuid4())
-        self.workflow_data = {}
+        self.message_bus = message_bus or MessageBus()
+        self.remote_agents = set(remote_agents)
+        # Pages go to output_sink when given, else to JSON files in output_dir
+        if output_sink is None and save_outputs:
+            output_sink = FileOutputSink(output_dir)
+        # Writes go through a background writer thread so disk latency stays off this loop
+        if output_sink is not None and async_writes:
+            output_sink = AsyncOutputSink(output_sink)
+        self.output_sink = output_sink
+        self.text_client = text_client
+        self.profile = resolve_profile(profile)
+        # FAQ and product pages are indexed for search as they arrive
+        self.page_index = page_index
+        self.stage_timeout = stage_timeout
+        self.conversation_timeout = conversation_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.conversations: Dict[str, Conversation] = {}
+        self.latencies = array("d")
+        self.stats = {"completed": 0, "failed": 0, "cancelled": 0, "retries": 0, "stage_timeouts": 0}
+        # Per-tenant outcome counts, in-flight conversations and latencies
+        self.tenants: Dict[str, dict] = {}
+
+        # Thread currently running the coordinating loop; other threads hand it their work
+        self._loop = Condition()
+        self._loop_owner: Optional[int] = None
+        # Conversations submitted from other threads, started by the loop on their "submit" message
+        self._incoming: Dict[str, Conversation] = {}
+
+        # One profiler per agent id, shared by all of its workers
+        self._profilers: Dict[str, AgentProfiler] = {}
 
         # Initialize autonomous agents
         self.agents = self._initialize_agents()
 
-        # Register state actions
-        self._register_state_actions()
+        # With max_workers > 1 local agents get extra workers while their queues back up
+        self.autoscaler = None
+        if max_workers > 1:
+            self.autoscaler = AgentAutoscaler(self.message_bus)
+            for agent in self.agents.values():
+                self.autoscaler.manage(
+                    agent,
+                    lambda agent=agent: self._create_agent(agent.agent_id),
+                    max_workers=max_workers
+                )
+            self.autoscaler.start()
+
+        # Stage request builders, dispatched on state entry and on retry
+        self._stage_requests = {
+            SystemState.PARSING_DATA: self._request_data_parsing,
+            SystemState.GENERATING_QUESTIONS: self._request_question_generation,
+            SystemState.GENERATING_FAQ: self._request_faq_generation,
+            SystemState.GENERATING_PRODUCT_PAGE: self._request_product_page_generation,
+            SystemState.GENERATING_COMPARISON: self._request_comparison_generation,
+        }
 
         # Register orchestrator with message bus
         self.message_bus.register_agent(self.orchestrator_id)
@@ -33,14 +142,23 @@ class WorkflowOrchestrator:
 
     def _initialize_agents(self):
         """Initialize and start autonomous agents."""
+        agent_keys = {
+            "parser": "data_parser",
+            "question_gen": "question_generator",
+            "faq_gen": "faq_generator",
+            "product_gen": "product_page_generator",
+            "comparison_gen": "comparison_generator",
+        }
         agents = {
-            "parser": DataParserAgent("data_parser", self.message_bus),
-            "question_gen": QuestionGeneratorAgent("question_generator", self.message_bus),
-            "faq_gen": FAQGeneratorAgent("faq_generator", self.message_bus),
-            "product_gen": ProductPageGeneratorAgent("product_page_generator", self.message_bus),
-            "comparison_gen": ComparisonAgent("comparison_generator", self.message_bus),
+            key: self._create_agent(agent_id)
+            for key, agent_id in agent_keys.items()
+            if agent_id not in self.remote_agents
         }
 
+        # Remote agents run elsewhere, but their queues must exist before the first request
+        for agent_id in self.remote_agents:
+            self.message_bus.register_agent(agent_id)
+
         # Start all agents (they run independently now)
         for agent in agents.values():
             agent.start()
@@ -48,183 +166,568 @@ class WorkflowOrchestrator:
         print(f"[{self.orchestrator_id}] All agents started autonomously\n")
         return agents
 
-    def _register_state_actions(self):
-        """Register actions triggered by state transitions."""
-        self.state_machine.register_action(
-            SystemState.PARSING_DATA,
-            self._request_data_parsing
-        )
-        self.state_machine.register_action(
-            SystemState.GENERATING_QUESTIONS,
-            self._request_question_generation
-        )
-        self.state_machine.register_action(
-            SystemState.GENERATING_FAQ,
-            self._request_faq_generation
-        )
-        self.state_machine.register_action(
-            SystemState.GENERATING_PRODUCT_PAGE,
-            self._request_product_page_generation
-        )
-        self.state_machine.register_action(
-            SystemState.GENERATING_COMPARISON,
-            self._request_comparison_generation
+    def _create_agent(self, agent_id: str):
+        """Build one local agent, handing the text client to agents that use it."""
+        if agent_id in TEXT_AGENTS and self.text_client:
+            agent = AGENT_CLASSES[agent_id](agent_id, self.message_bus, text_client=self.text_client)
+        else:
+            agent = AGENT_CLASSES[agent_id](agent_id, self.message_bus)
+        # Workers added by the autoscaler share the profiler, so one CONTROL message covers the pool
+        profiler = self._profilers.get(agent_id)
+        if profiler is None:
+            profiler = self._profilers[agent_id] = AgentProfiler(agent_id)
+        agent.profiler = profiler
+        return agent
+
+    def _register_state_actions(self, conversation: Conversation):
+        """Register actions triggered by the conversation's state transitions."""
+        for state in conversation.profile.stages:
+            conversation.state_machine.register_action(
+                state,
+                lambda conversation=conversation: self._start_stage(conversation)
+            )
+
+    def submit(self, raw_data: Union[dict, ProductRow], priority: MessagePriority = MessagePriority.NORMAL,
+               timeout: Optional[float] = None, tenant: str = "default",
+               profile: ProfileSpec = None) -> Conversation:
+        """Start a new conversation for one product without waiting for it.
+
+        `timeout` overrides the orchestrator's conversation_timeout for this
+        conversation; drive it to completion with run_until_complete().
+        Safe to call from any thread: while another thread runs the loop,
+        the conversation is queued to it like cancel() and started on its
+        next iteration.
+        Every message of the conversation is tagged with `tenant`, and agent
+        queues share their capacity fairly between tenants. `profile` (a
+        profile, profile name or list of pages) overrides the
+        orchestrator's default pipeline profile. A ProductRow is
+        materialized into a dict only here, for as long as it is in flight.
+        """
+        if isinstance(raw_data, ProductRow):
+            raw_data = raw_data.to_dict()
+        timeout = self.conversation_timeout if timeout is None else timeout
+        profile = self.profile if profile is None else resolve_profile(profile)
+        conversation = Conversation(
+            conversation_id=str(uuid.uuid4()),
+            priority=priority,
+            tenant=tenant,
+            profile=profile,
+            state_machine=StateMachine(profile.stages)
         )
+        if timeout is not None:
+            conversation.deadline = conversation.started_at + timeout
+        conversation.workflow_data["input"] = raw_data
+
+        with self._loop:
+            queued = self._loop_owner not in (None, get_ident())
+            if queued:
+                self._incoming[conversation.conversation_id] = conversation
+            else:
+                self._start(conversation)
+        if queued:
+            self.message_bus.send_message(Message(
+                sender=self.orchestrator_id,
+                receiver=self.orchestrator_id,
+                message_type=MessageType.REQUEST,
+                content={"action": "submit"},
+                timestamp=None,
+                conversation_id=conversation.conversation_id,
+                priority=MessagePriority.INTERACTIVE
+            ))
+        return conversation
+
+    def _start(self, conversation: Conversation):
+        """Register a new conversation and dispatch its first stage, on the loop's thread."""
+        tenant = conversation.tenant
+        stats = self.tenants.get(tenant)
+        if stats is None:
+            stats = self.tenants[tenant] = {
+                "submitted": 0, "in_flight": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                "started_at": conversation.started_at, "finished_at": None, "latencies": array("d")
+            }
+        stats["submitted"] += 1
+        stats["in_flight"] += 1
+
+        self._register_state_actions(conversation)
+        self.conversations[conversation.conversation_id] = conversation
 
-    def run_pipeline(self, raw_data: dict):
-        """Run coordinated multi-agent pipeline."""
+        # Trigger initial state transition
+        conversation.state_machine.trigger(Event.START_PIPELINE)
+
+    def run_pipeline(self, raw_data: dict, priority: MessagePriority = MessagePriority.NORMAL,
+                     timeout: Optional[float] = None, profile: ProfileSpec = None) -> dict:
+        """Run coordinated multi-agent pipeline and return the generated pages.
+
+        Every message of the run carries `priority`; tag interactive runs
+        with MessagePriority.INTERACTIVE so they overtake bulk work queued
+        on the same bus (see MessagePriority).
+        Agents stay running afterwards, so the same orchestrator can serve
+        further runs; call shutdown() when done. Only the pages of
+        `profile` (default: the orchestrator's profile) are generated and
+        returned. Several threads may run pipelines at once, also beside a
+        catalog run: whichever thread is running the loop drives them all.
+        """
         print(f"{'='*70}")
         print(f"[{self.orchestrator_id}] Starting Autonomous Multi-Agent Pipeline")
-        print(f"Conversation ID: {self.conversation_id}")
         print(f"{'='*70}\n")
 
-        self.workflow_data["input"] = raw_data
-
-        # Trigger initial state transition
-        self.state_machine.trigger(Event.START_PIPELINE)
+        conversation = self.submit(raw_data, priority=priority, timeout=timeout, profile=profile)
+        print(f"Conversation ID: {conversation.conversation_id} (priority: {priority.name.lower()}, "
+              f"profile: {conversation.profile.name})\n")
 
         # Listen for agent responses and coordinate workflow
-        self._coordinate_workflow()
+        self._wait_for(conversation)
+        if self.output_sink:
+            self.output_sink.flush()
 
-    def _request_data_parsing(self):
-        """Request data parsing from autonomous agent."""
-        print(f"\n[{self.orchestrator_id}] Requesting data parsing...\n")
+        if conversation.state != SystemState.COMPLETED:
+            raise RuntimeError(f"Pipeline {conversation.state.value}: {conversation.error}")
+
+        print(f"\n{'='*70}")
+        print(f"[{self.orchestrator_id}] Pipeline Completed Successfully in {conversation.latency:.3f}s")
+        print(f"{'='*70}\n")
+        return conversation.results()
+
+    def shutdown(self):
+        """Stop all agents owned by this orchestrator and close the output sink."""
+        self._shutdown_agents()
+        if self.output_sink:
+            self.output_sink.close()
+
+    def cancel(self, conversation_id: str, reason: str = "cancelled"):
+        """Cancel an active conversation and release its resources.
+
+        Safe to call from any thread: the request is queued to the
+        coordinating loop, which applies it on its next iteration.
+        """
         message = Message(
             sender=self.orchestrator_id,
-            receiver="data_parser",
+            receiver=self.orchestrator_id,
             message_type=MessageType.REQUEST,
-            content={
-                "action": "parse_data",
-                "data": self.workflow_data["input"]
-            },
+            content={"action": "cancel", "reason": reason},
             timestamp=None,
-            conversation_id=self.conversation_id
+            conversation_id=conversation_id,
+            priority=MessagePriority.INTERACTIVE
         )
         self.message_bus.send_message(message)
 
-    def _request_question_generation(self):
-        """Request question generation from autonomous agent."""
-        print(f"\n[{self.orchestrator_id}] Requesting question generation...\n")
+    def _cancel(self, conversation: Conversation, reason: str):
+        """Cancel a conversation from the coordinating loop."""
+        print(f"\n[{self.orchestrator_id}] Conversation {conversation.conversation_id} cancelled: {reason}\n")
+        conversation.error = reason
+        conversation.state_machine.trigger(Event.CANCEL)
+        self._finish(conversation)
+
+    def control_agent(self, agent_id: str, action: str, timeout: float = 10.0, **params) -> dict:
+        """Apply a runtime CONTROL action to a live agent and return its reply.
+
+        Actions: profile_start, profile_stop, profile_dump, profile_reset,
+        tracemalloc_start, tracemalloc_stop and tracemalloc_dump. Dumps
+        accept `path`; without one they are written under profiles/, and
+        the reply carries the paths. Local workers of one agent id share a
+        profiler, so the action applies to the whole worker pool. The agent
+        applies it between messages and replies to a queue registered for
+        this call only, so this works whether or not a pipeline is running
+        and is safe to call from any thread. Raises TimeoutError without a
+        reply in `timeout` seconds.
+        """
+        conversation_id = f"control-{uuid.uuid4()}"
+        reply_queue = f"{self.orchestrator_id}.{conversation_id}"
+        self.message_bus.register_agent(reply_queue)
+        try:
+            self.message_bus.send_message(Message(
+                sender=reply_queue,
+                receiver=agent_id,
+                message_type=MessageType.CONTROL,
+                content={"action": action, **params},
+                timestamp=None,
+                conversation_id=conversation_id,
+                priority=MessagePriority.INTERACTIVE
+            ))
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{agent_id} did not answer {action} within {timeout}s")
+                reply = self.message_bus.receive_message(reply_queue, timeout=remaining)
+                # Broadcasts can land here too; only the agent's reply counts
+                if reply is not None and reply.conversation_id == conversation_id:
+                    return reply.content
+        finally:
+            self.message_bus.unregister_agent(reply_queue)
+
+    def _send_request(self, conversation: Conversation, receiver: str, content: dict):
+        """Send a stage request on behalf of a conversation."""
         message = Message(
             sender=self.orchestrator_id,
-            receiver="question_generator",
+            receiver=receiver,
             message_type=MessageType.REQUEST,
-            content={"action": "generate_questions"},
+            content=content,
             timestamp=None,
-            conversation_id=self.conversation_id
+            conversation_id=conversation.conversation_id,
+            priority=conversation.priority,
+            tenant=conversation.tenant
         )
         self.message_bus.send_message(message)
 
-    def _request_faq_generation(self):
+    def _request_data_parsing(self, conversation: Conversation):
+        """Request data parsing from autonomous agent."""
+        print(f"\n[{self.orchestrator_id}] Requesting data parsing...\n")
+        self._send_request(conversation, "data_parser", {
+            "action": "parse_data",
+            "data": conversation.workflow_data["input"]
+        })
+
+    def _request_question_generation(self, conversation: Conversation):
+        """Request question generation from autonomous agent."""
+        print(f"\n[{self.orchestrator_id}] Requesting question generation...\n")
+        self._send_request(conversation, "question_generator", {
+            "action": "generate_questions",
+            "product": conversation.workflow_data.get("product")
+        })
+
+    def _request_faq_generation(self, conversation: Conversation):
         """Request FAQ generation from autonomous agent."""
         print(f"\n[{self.orchestrator_id}] Requesting FAQ page generation...\n")
-        message = Message(
-            sender=self.orchestrator_id,
-            receiver="faq_generator",
-            message_type=MessageType.REQUEST,
-            content={
-                "action": "generate_faq",
-                "product": self.workflow_data.get("product"),
-                "questions": self.workflow_data.get("questions")
-            },
-            timestamp=None,
-            conversation_id=self.conversation_id
-        )
-        self.message_bus.send_message(message)
+        self._send_request(conversation, "faq_generator", {
+            "action": "generate_faq",
+            "product": conversation.workflow_data.get("product"),
+            "questions": conversation.workflow_data.get("questions")
+        })
 
-    def _request_product_page_generation(self):
+    def _request_product_page_generation(self, conversation: Conversation):
         """Request product page generation from autonomous agent."""
         print(f"\n[{self.orchestrator_id}] Requesting product page generation...\n")
-        message = Message(
-            sender=self.orchestrator_id,
-            receiver="product_page_generator",
-            message_type=MessageType.REQUEST,
-            content={
-                "action": "generate_product_page",
-                "product": self.workflow_data.get("product")
-            },
-            timestamp=None,
-            conversation_id=self.conversation_id
-        )
-        self.message_bus.send_message(message)
+        self._send_request(conversation, "product_page_generator", {
+            "action": "generate_product_page",
+            "product": conversation.workflow_data.get("product")
+        })
 
-    def _request_comparison_generation(self):
+    def _request_comparison_generation(self, conversation: Conversation):
         """Request comparison generation from autonomous agent."""
         print(f"\n[{self.orchestrator_id}] Requesting comparison page generation...\n")
-        message = Message(
-            sender=self.orchestrator_id,
-            receiver="comparison_generator",
-            message_type=MessageType.REQUEST,
-            content={
-                "action": "generate_comparison",
-                "product": self.workflow_data.get("product")
-            },
-            timestamp=None,
-            conversation_id=self.conversation_id
-        )
-        self.message_bus.send_message(message)
-
-    def _coordinate_workflow(self):
-        """Listen for agent responses and dynamically coordinate workflow."""
-        while self.state_machine.current_state != SystemState.COMPLETED:
-            message = self.message_bus.receive_message(self.orchestrator_id, timeout=1)
-
-            if message and message.conversation_id == self.conversation_id:
-                self._handle_agent_response(message)
+        self._send_request(conversation, "comparison_generator", {
+            "action": "generate_comparison",
+            "product": conversation.workflow_data.get("product")
+        })
+
+    def _start_stage(self, conversation: Conversation):
+        """Enter a new stage: reset its retry budget and dispatch it."""
+        conversation.attempts = 0
+        self._dispatch_stage(conversation)
+
+    def _dispatch_stage(self, conversation: Conversation):
+        """Send the current stage's request and arm its timeout."""
+        conversation.retry_at = None
+        conversation.attempts += 1
+        conversation.stage_deadline = time.monotonic() + self.stage_timeout
+        self._stage_requests[conversation.state](conversation)
+
+    def _retry_stage(self, conversation: Conversation, reason: str, retryable: bool = True):
+        """Schedule the current stage again with backoff, or fail when out of retries."""
+        if not retryable or conversation.attempts > self.max_retries:
+            self._fail(conversation, f"{conversation.state.value} failed after "
+                                     f"{conversation.attempts} attempt(s): {reason}")
+            return
+
+        delay = self.retry_backoff * (2 ** (conversation.attempts - 1))
+        print(f"[{self.orchestrator_id}] Retrying {conversation.state.value} in {delay:.2f}s ({reason})")
+        self.stats["retries"] += 1
+        conversation.stage_deadline = None
+        conversation.retry_at = time.monotonic() + delay
+
+    def _fail(self, conversation: Conversation, reason: str):
+        """Fail a conversation and release its resources."""
+        print(f"\n[{self.orchestrator_id}] Conversation {conversation.conversation_id} failed: {reason}\n")
+        conversation.error = reason
+        conversation.state_machine.trigger(Event.ERROR_OCCURRED)
+        self._finish(conversation)
+
+    def _finish(self, conversation: Conversation):
+        """Record the outcome of a finished conversation and forget it."""
+        conversation.finished_at = time.monotonic()
+        conversation.stage_deadline = None
+        conversation.retry_at = None
+        self.conversations.pop(conversation.conversation_id, None)
+
+        tenant = self.tenants[conversation.tenant]
+        tenant["in_flight"] -= 1
+        tenant["finished_at"] = conversation.finished_at
+
+        if conversation.state == SystemState.COMPLETED:
+            self.stats["completed"] += 1
+            tenant["completed"] += 1
+            self.latencies.append(conversation.latency)
+            tenant["latencies"].append(conversation.latency)
+        else:
+            outcome = "failed" if conversation.state == SystemState.ERROR else "cancelled"
+            self.stats[outcome] += 1
+            tenant[outcome] += 1
+            # Drop work still queued for this conversation
+            discarded = self.message_bus.purge(conversation.conversation_id)
+            if discarded:
+                print(f"[{self.orchestrator_id}] Discarded {discarded} queued message(s)")
+
+        # The input and intermediate data are no longer needed
+        conversation.workflow_data.pop("input", None)
+        conversation.workflow_data.pop("questions", None)
+
+        conversation.done.set()
+        with self._loop:
+            # Threads waiting in run_pipeline() re-check their conversation
+            self._loop.notify_all()
+
+    def run_until_complete(self):
+        """Listen for agent responses and timers until no conversation is active."""
+        with self._driving():
+            while self.conversations:
+                self._step()
+
+        if self.output_sink:
+            self.output_sink.flush()
+
+    def run_catalog(self, products: Iterable[Union[dict, ProductRow]], max_in_flight: int = 32,
+                    priority: MessagePriority = MessagePriority.BULK, tenant: str = "default",
+                    profile: ProfileSpec = None) -> dict:
+        """Stream a catalog through the pipeline and return the latency report.
+
+        Products are pulled from the iterable only as in-flight conversations
+        finish, so generation starts with the first product and memory stays
+        bounded by `max_in_flight` regardless of catalog size. A catalog that
+        has to stay in memory (e.g. to be re-run) can be passed as a
+        ColumnarCatalog, whose rows are expanded to dicts only on submit.
+        Failed products are counted and logged but do not stop the run.
+        """
+        return self.run_catalogs({tenant: products}, max_in_flight=max_in_flight, priority=priority,
+                                 profile=profile)
+
+    def run_catalogs(self, catalogs: Dict[str, Iterable[Union[dict, ProductRow]]], max_in_flight: int = 32,
+                     priority: MessagePriority = MessagePriority.BULK, profile: ProfileSpec = None) -> dict:
+        """Stream several tenants' catalogs through the pipeline together.
+
+        Free in-flight slots go to the tenant with the fewest in-flight
+        conversations relative to its weight, and agent queues serve tenants
+        by weighted round-robin, so a small catalog finishes in about the
+        same time whether or not a large one is running beside it.
+        """
+        profile = self.profile if profile is None else resolve_profile(profile)
+        sources = {tenant: iter(products) for tenant, products in catalogs.items()}
+        # Read once: on a socket bus this is a round trip to the bus server
+        weights = self.message_bus.tenant_weights
+        submitted = 0
+
+        with self._driving():
+            while True:
+                while sources and len(self.conversations) < max_in_flight:
+                    tenant = min(
+                        sources,
+                        key=lambda t: (self.tenants[t]["in_flight"] if t in self.tenants else 0) / weights.get(t, 1.0)
+                    )
+                    raw_data = next(sources[tenant], _END_OF_CATALOG)
+                    if raw_data is _END_OF_CATALOG:
+                        del sources[tenant]
+                        continue
+                    self.submit(raw_data, priority=priority, tenant=tenant, profile=profile)
+                    submitted += 1
+
+                if not self.conversations:
+                    break
+                self._step()
+
+        if self.output_sink:
+            self.output_sink.flush()
+
+        report = self.latency_report()
+        print(f"[{self.orchestrator_id}] Catalog run finished: {submitted} product(s) submitted, {report}")
+        return report
+
+    @contextmanager
+    def _driving(self):
+        """Run the coordinating loop on this thread, first waiting for any other thread running it."""
+        if self._loop_owner == get_ident():
+            yield
+            return
+        with self._loop:
+            while self._loop_owner is not None:
+                self._loop.wait()
+            self._loop_owner = get_ident()
+        try:
+            yield
+        finally:
+            self._release_loop()
+
+    def _release_loop(self):
+        with self._loop:
+            self._loop_owner = None
+            self._loop.notify_all()
+
+    def _wait_for(self, conversation: Conversation):
+        """Wait until a conversation finishes, driving the loop while no other thread does."""
+        with self._loop:
+            while not conversation.done.is_set() and self._loop_owner not in (None, get_ident()):
+                self._loop.wait()
+            if conversation.done.is_set():
+                return
+            nested = self._loop_owner is not None
+            self._loop_owner = get_ident()
+        try:
+            while not conversation.done.is_set():
+                self._step()
+        finally:
+            if not nested:
+                self._release_loop()
+
+    def _step(self):
+        """Process at most one message, then apply due timers."""
+        timeout = self._time_until_next_timer()
+        message = self.message_bus.receive_message(self.orchestrator_id, timeout=timeout)
+
+        if message and message.sender == self.orchestrator_id and message.content.get("action") == "submit":
+            conversation = self._incoming.pop(message.conversation_id, None)
+            if conversation is not None:
+                self._start(conversation)
+        elif message:
+            conversation = self.conversations.get(message.conversation_id)
+            if conversation:
+                self._handle_agent_response(conversation, message)
+
+        self._check_timers()
+
+    def _time_until_next_timer(self) -> Optional[float]:
+        """Seconds until the earliest deadline, timeout or retry; None if there is none."""
+        timers = [t for t in (c.next_timer() for c in self.conversations.values()) if t is not None]
+        if not timers:
+            return None
+        return max(0.0, min(timers) - time.monotonic())
+
+    def _check_timers(self):
+        """Apply expired conversation deadlines, stage timeouts and due retries."""
+        now = time.monotonic()
+        for conversation in list(self.conversations.values()):
+            if conversation.deadline is not None and now >= conversation.deadline:
+                self._fail(conversation, f"deadline exceeded during {conversation.state.value}")
+            elif conversation.retry_at is not None and now >= conversation.retry_at:
+                self._dispatch_stage(conversation)
+            elif conversation.stage_deadline is not None and now >= conversation.stage_deadline:
+                self.stats["stage_timeouts"] += 1
+                self._retry_stage(conversation, f"no response within {self.stage_timeout}s")
+
+    def _handle_agent_response(self, conversation: Conversation, message: Message):
+        """Handle responses from autonomous agents and trigger state transitions."""
+        if message.sender == self.orchestrator_id and message.content.get("action") == "cancel":
+            self._cancel(conversation, message.content.get("reason"))
+            return
 
-            time.sleep(0.1)
+        # Ignore late replies from an earlier stage or a superseded attempt
+        if message.sender != self.STAGE_AGENTS.get(conversation.state):
+            return
 
-        print(f"\n{'='*70}")
-        print(f"[{self.orchestrator_id}] Pipeline Completed Successfully!")
-        print(f"{'='*70}\n")
-        self._shutdown_agents()
-
-    def _handle_agent_response(self, message: Message):
-        """Handle responses from autonomous agents and trigger state transitions."""
         if message.message_type == MessageType.RESPONSE:
             content = message.content
+            conversation.stage_deadline = None
+            conversation.retry_at = None
 
             if message.sender == "data_parser":
                 print(f"\n[{self.orchestrator_id}] Received parsed product data\n")
-                self.workflow_data["product"] = content["product"]
-                self.state_machine.trigger(Event.DATA_PARSED)
+                conversation.workflow_data["product"] = content["product"]
+                conversation.state_machine.trigger(Event.DATA_PARSED)
 
             elif message.sender == "question_generator":
                 print(f"\n[{self.orchestrator_id}] Received {content['count']} generated questions\n")
-                self.workflow_data["questions"] = content["questions"]
-                self.state_machine.trigger(Event.QUESTIONS_GENERATED)
+                conversation.workflow_data["questions"] = content["questions"]
+                conversation.state_machine.trigger(Event.QUESTIONS_GENERATED)
 
             elif message.sender == "faq_generator":
                 print(f"\n[{self.orchestrator_id}] Received FAQ page\n")
-                self.workflow_data["faq_page"] = content["faq_page"]
-                self._save_json(content["faq_page"], "output/faq.json")
-                self.state_machine.trigger(Event.FAQ_GENERATED)
+                conversation.workflow_data["faq_page"] = content["faq_page"]
+                self._save_page(conversation, "faq", content["faq_page"])
+                conversation.state_machine.trigger(Event.FAQ_GENERATED)
 
             elif message.sender == "product_page_generator":
                 print(f"\n[{self.orchestrator_id}] Received product page\n")
-                self.workflow_data["product_page"] = content["product_page"]
-                self._save_json(content["product_page"], "output/product_page.json")
-                self.state_machine.trigger(Event.PRODUCT_PAGE_GENERATED)
+                conversation.workflow_data["product_page"] = content["product_page"]
+                self._save_page(conversation, "product_page", content["product_page"])
+                conversation.state_machine.trigger(Event.PRODUCT_PAGE_GENERATED)
 
             elif message.sender == "comparison_generator":
                 print(f"\n[{self.orchestrator_id}] Received comparison page\n")
-                self.workflow_data["comparison_page"] = content["comparison_page"]
-                self._save_json(content["comparison_page"], "output/comparison_page.json")
-                self.state_machine.trigger(Event.COMPARISON_GENERATED)
+                conversation.workflow_data["comparison_page"] = content["comparison_page"]
+                self._save_page(conversation, "comparison_page", content["comparison_page"])
+                conversation.state_machine.trigger(Event.COMPARISON_GENERATED)
+
+            if conversation.state == SystemState.COMPLETED:
+                self._finish(conversation)
+
+        elif message.message_type == MessageType.QUERY:
+            # The agent lacks data it needs; the stage request carries it, so resend
+            print(f"\n[{self.orchestrator_id}] Query from {message.sender}: {message.content}\n")
+            answerable = message.content.get("query") == "need_product_data" and conversation.workflow_data.get("product")
+            if answerable and conversation.attempts <= self.max_retries:
+                self._dispatch_stage(conversation)
+            else:
+                self._fail(conversation, f"Unanswerable query from {message.sender}: {message.content}")
 
         elif message.message_type == MessageType.ERROR:
             print(f"\n[{self.orchestrator_id}] Error from {message.sender}: {message.content}\n")
-            self.state_machine.current_state = SystemState.ERROR
-
-    def _save_json(self, data: dict, filepath: str):
-        """Save data as JSON file."""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"  ✓ Saved: {filepath}")
+            self._retry_stage(
+                conversation,
+                message.content.get("error"),
+                retryable=message.content.get("retryable", True)
+            )
+
+    def latency_report(self) -> dict:
+        """Completed-conversation latency percentiles (seconds) and outcome counts."""
+        report = dict(self.stats)
+        report.update(_percentiles(self.latencies))
+        return report
+
+    def tenant_report(self) -> Dict[str, dict]:
+        """Per-tenant outcomes, throughput (products/s), latency percentiles and agent queue waits."""
+        waits: Dict[str, dict] = {}
+        for agent_id in self.STAGE_AGENTS.values():
+            for tenant, stats in self.message_bus.tenant_stats(agent_id).items():
+                total = waits.setdefault(tenant, {"served": 0, "wait": 0.0, "max_wait": 0.0})
+                total["served"] += stats["served"]
+                total["wait"] += stats["avg_wait"] * stats["served"]
+                total["max_wait"] = max(total["max_wait"], stats["max_wait"])
+
+        report = {}
+        for tenant, stats in self.tenants.items():
+            entry = {key: stats[key] for key in ("submitted", "in_flight", "completed", "failed", "cancelled")}
+            end = stats["finished_at"] if stats["in_flight"] == 0 and stats["finished_at"] else time.monotonic()
+            elapsed = end - stats["started_at"]
+            entry["throughput"] = round(stats["completed"] / elapsed, 2) if elapsed > 0 else 0.0
+            entry.update(_percentiles(stats["latencies"]))
+            wait = waits.get(tenant)
+            if wait and wait["served"]:
+                entry["avg_queue_wait"] = round(wait["wait"] / wait["served"], 4)
+                entry["max_queue_wait"] = round(wait["max_wait"], 4)
+            report[tenant] = entry
+        return report
+
+    def _save_page(self, conversation: Conversation, page_type: str, page: dict):
+        """Hand a generated page to the output sink and the search index."""
+        if self.output_sink:
+            self.output_sink.write(conversation.workflow_data["product"]["name"], page_type, page)
+        if self.page_index is not None:
+            self.page_index.add_page(conversation.workflow_data["product"], page_type, page)
 
     def _shutdown_agents(self):
         """Gracefully shutdown all autonomous agents."""
         print(f"\n[{self.orchestrator_id}] Shutting down agents...\n")
+        if self.autoscaler:
+            self.autoscaler.stop()
         for agent in self.agents.values():
             agent.stop()
         print(f"[{self.orchestrator_id}] All agents shut down\n")
+
+
+def _percentiles(latencies) -> dict:
+    """p50/p95/p99/max of a latency series in seconds; empty when there are none."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    last = len(ordered) - 1
+    report = {name: round(ordered[round(q * last)], 4) for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+    report["max"] = round(ordered[-1], 4)
+    return report
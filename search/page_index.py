@@ -0,0 +1,451 @@
+from array import array
+from itertools import accumulate, chain
+from operator import sub
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set
+from catalog.columnar_store import Vocabulary
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+
+INDEXED_PAGE_TYPES = ("faq", "product_page")
+INDEX_MAGIC = b"KCPI"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sBII")  # magic, version, metadata length, document count
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it",
+    "its", "of", "on", "or", "the", "this", "to", "with", "your",
+))
+# Query syntax: field:value, field:"quoted value", "phrase", words, AND/OR/NOT, -term and parentheses
+_QUERY_TOKEN = re.compile(r'\(|\)|-?[a-z_]+:"[^"]*"|-?"[^"]*"|[^\s()]+', re.IGNORECASE)
+QUERY_FIELDS = ("category", "skin", "ingredient", "product", "page")
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+# A posting list moves to a bitmap once it holds more than 1/32 of all
+# documents: from there the bitmap is the smaller of the two
+DENSE_FRACTION = 32
+MIN_DENSE_POSTINGS = 1024
+# save() compacts the index once more than this share of documents is retired
+COMPACT_FRACTION = 0.25
+
+
+class Hit(NamedTuple):
+    """One matching document: a FAQ entry (item = its position in faqs) or a whole product page (item = None)."""
+    product: str
+    page_type: str
+    item: Optional[int]
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for malformed search queries."""
+
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+class PageIndex:
+    """Incremental inverted index over generated FAQ entries and product pages.
+
+    Every FAQ entry and every product page is one document. Documents are
+    indexed under their words plus structured keys: category:<faq
+    category>, skin:<skin type>, ingredient:<ingredient>, product:<name>
+    and page:<page type>; the skin and ingredient keys come from the
+    product, so "category:safety skin:oily" finds safety answers for oily
+    skin products. Regenerating a page retires its previous documents.
+
+    Rare terms keep ascending arrays of document ids; common ones (more
+    than 1/32 of documents, where a bit per document is smaller) switch to
+    bitmaps. Queries are evaluated on Python integers used as bitsets, so
+    AND/OR/NOT over hundreds of thousands of documents are a few word-wide
+    operations rather than per-document work.
+
+    save() writes one zlib stream of delta-encoded posting arrays and raw
+    bitmaps; load() restores it. Retired documents keep their ids until
+    compact() renumbers the live ones, which save() does once more than
+    COMPACT_FRACTION of all documents are retired.
+    """
+
+    def __init__(self):
+        self.products = Vocabulary()
+        self._postings: Dict[str, array] = {}
+        self._bitmaps: Dict[str, bytearray] = {}
+        self._doc_product = array("I")
+        self._doc_page = array("B")
+        self._doc_item = array("i")
+        # (product code, page type index) -> document ids of the current version
+        self._page_docs: Dict[tuple, List[int]] = {}
+        self._deleted = bytearray()
+        self._deleted_count = 0
+
+    def __len__(self) -> int:
+        """Number of live documents."""
+        return len(self._doc_product) - self._deleted_count
+
+    def add_page(self, product: dict, page_type: str, page: dict):
+        """Index (or re-index) one generated page of a product."""
+        if page_type not in INDEXED_PAGE_TYPES:
+            return
+        product_code = self.products.code(product["name"])
+        page_code = INDEXED_PAGE_TYPES.index(page_type)
+        key = (product_code, page_code)
+        for doc in self._page_docs.pop(key, ()):
+            _set_bit(self._deleted, doc)
+            self._deleted_count += 1
+
+        shared = {f"product:{product['name'].lower()}", f"page:{page_type}"}
+        shared.update(f"skin:{skin.lower()}" for skin in product.get("skin_type", ()))
+        shared.update(f"ingredient:{ingredient.lower()}" for ingredient in product.get("key_ingredients", ()))
+
+        docs = []
+        if page_type == "faq":
+            for item, faq in enumerate(page.get("faqs", ())):
+                terms = set(shared)
+                terms.add(f"category:{faq['category'].lower()}")
+                terms.update(tokenize(faq["question"]))
+                terms.update(tokenize(faq["answer"]))
+                docs.append(self._add_document(product_code, page_code, item, terms))
+        else:
+            terms = set(shared)
+            for text in _strings(page):
+                terms.update(tokenize(text))
+            docs.append(self._add_document(product_code, page_code, -1, terms))
+        self._page_docs[key] = docs
+
+    def remove_product(self, product_name: str):
+        """Retire every document of a product, e.g. when it leaves the catalog."""
+        product_code = self.products.lookup(product_name)
+        if product_code is None:
+            return
+        for page_code in range(len(INDEXED_PAGE_TYPES)):
+            for doc in self._page_docs.pop((product_code, page_code), ()):
+                _set_bit(self._deleted, doc)
+                self._deleted_count += 1
+
+    def compact(self):
+        """Drop retired documents and products without live pages, renumbering what remains."""
+        if not self._deleted_count:
+            return
+        live_docs = list(_iter_bits(self._live()))
+        remap = array("i", [-1]) * len(self._doc_product)
+        for new, old in enumerate(live_docs):
+            remap[old] = new
+
+        products = Vocabulary()
+        strings = self.products.strings
+        doc_product = array("I", (products.code(strings[self._doc_product[doc]]) for doc in live_docs))
+        product_remap = {self.products.lookup(name): code for code, name in enumerate(products.strings)}
+
+        postings: Dict[str, array] = {}
+        bitmaps: Dict[str, bytearray] = {}
+        dense_threshold = max(MIN_DENSE_POSTINGS, len(live_docs) // DENSE_FRACTION)
+        live = self._live()
+        sources = [(term, (remap[doc] for doc in posting)) for term, posting in self._postings.items()]
+        sources += [(term, (remap[doc] for doc in _iter_bits(int.from_bytes(bitmap, "little") & live)))
+                    for term, bitmap in self._bitmaps.items()]
+        for term, docs in sources:
+            posting = array("I", (doc for doc in docs if doc >= 0))
+            if len(posting) > dense_threshold:
+                bitmap = bitmaps[term] = bytearray()
+                for doc in posting:
+                    _set_bit(bitmap, doc)
+            elif posting:
+                postings[term] = posting
+
+        self.products = products
+        self._postings = postings
+        self._bitmaps = bitmaps
+        self._doc_product = doc_product
+        self._doc_page = array("B", (self._doc_page[doc] for doc in live_docs))
+        self._doc_item = array("i", (self._doc_item[doc] for doc in live_docs))
+        self._page_docs = {(product_remap[product], page): [remap[doc] for doc in docs]
+                           for (product, page), docs in self._page_docs.items()}
+        self._deleted = bytearray()
+        self._deleted_count = 0
+
+    def _add_document(self, product_code: int, page_code: int, item: int, terms: Set[str]) -> int:
+        doc = len(self._doc_product)
+        self._doc_product.append(product_code)
+        self._doc_page.append(page_code)
+        self._doc_item.append(item)
+        postings = self._postings
+        bitmaps = self._bitmaps
+        dense_threshold = max(MIN_DENSE_POSTINGS, doc // DENSE_FRACTION)
+
+        for term in terms:
+            bitmap = bitmaps.get(term)
+            if bitmap is not None:
+                _set_bit(bitmap, doc)
+                continue
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = array("I")
+            posting.append(doc)
+            if len(posting) > dense_threshold:
+                bitmap = bitmaps[term] = bytearray()
+                for posted in posting:
+                    _set_bit(bitmap, posted)
+                del postings[term]
+        return doc
+
+    def count(self, query: str) -> int:
+        """Number of documents matching a boolean query."""
+        return self._evaluate(query).bit_count()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hit]:
+        """Documents matching a boolean query, in indexing order."""
+        strings = self.products.strings
+        hits = []
+        for doc in _iter_bits(self._evaluate(query)):
+            if limit is not None and len(hits) >= limit:
+                break
+            item = self._doc_item[doc]
+            hits.append(Hit(strings[self._doc_product[doc]], INDEXED_PAGE_TYPES[self._doc_page[doc]],
+                            item if item >= 0 else None))
+        return hits
+
+    def matching_products(self, query: str) -> List[str]:
+        """Names of products with at least one matching document, sorted."""
+        doc_product = self._doc_product
+        codes = {doc_product[doc] for doc in _iter_bits(self._evaluate(query))}
+        return sorted(self.products.strings[code] for code in codes)
+
+    def _evaluate(self, query: str) -> int:
+        return _QueryParser(_QUERY_TOKEN.findall(query), self).parse() & self._live()
+
+    def _lookup(self, term: str) -> int:
+        bitmap = self._bitmaps.get(term)
+        if bitmap is not None:
+            return int.from_bytes(bitmap, "little")
+        posting = self._postings.get(term)
+        if posting is None:
+            return 0
+        bits = bytearray((len(self._doc_product) + 7) >> 3)
+        for doc in posting:
+            bits[doc >> 3] |= 1 << (doc & 7)
+        return int.from_bytes(bits, "little")
+
+    def _live(self) -> int:
+        everything = (1 << len(self._doc_product)) - 1
+        if not self._deleted_count:
+            return everything
+        return everything & ~int.from_bytes(self._deleted, "little")
+
+    def save(self, path: str):
+        """Write the index atomically in its compact on-disk format."""
+        if self._deleted_count > len(self._doc_product) * COMPACT_FRACTION:
+            self.compact()
+        sparse_terms = list(self._postings)
+        dense_terms = list(self._bitmaps)
+        meta = {
+            "products": self.products.strings,
+            "sparse_terms": sparse_terms,
+            "sparse_lengths": [len(self._postings[term]) for term in sparse_terms],
+            "dense_terms": dense_terms,
+            "dense_lengths": [len(self._bitmaps[term]) for term in dense_terms],
+            "deleted_length": len(self._deleted),
+        }
+        meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        compressor = zlib.compressobj(6)
+        chunks = [compressor.compress(meta_bytes)]
+        for column in (self._doc_product, self._doc_page, self._doc_item):
+            chunks.append(compressor.compress(_le_bytes(column)))
+        for term in sparse_terms:
+            chunks.append(compressor.compress(_le_bytes(_delta_encode(self._postings[term]))))
+        for term in dense_terms:
+            chunks.append(compressor.compress(self._bitmaps[term]))
+        chunks.append(compressor.compress(self._deleted))
+        chunks.append(compressor.flush())
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(meta_bytes), len(self._doc_product)))
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PageIndex":
+        """Read an index written by save(); ValueError if the file is not a readable index."""
+        with open(path, "rb") as f:
+            header = f.read(_INDEX_HEADER.size)
+            if len(header) < _INDEX_HEADER.size:
+                raise ValueError(f"Not a page index: {path}")
+            magic, version, meta_length, doc_count = _INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"Not a page index: {path}")
+            try:
+                return cls._from_payload(memoryview(zlib.decompress(f.read())), meta_length, doc_count)
+            except (zlib.error, ValueError, KeyError, TypeError, IndexError) as e:
+                raise ValueError(f"Corrupt page index {path}: {e}") from None
+
+    @classmethod
+    def _from_payload(cls, payload: memoryview, meta_length: int, doc_count: int) -> "PageIndex":
+        meta = json.loads(bytes(payload[:meta_length]))
+        position = meta_length
+        index = cls()
+        for name in meta["products"]:
+            index.products.code(name)
+        for column, typecode in (("_doc_product", "I"), ("_doc_page", "B"), ("_doc_item", "i")):
+            values, position = _read_array(payload, position, typecode, doc_count)
+            setattr(index, column, values)
+        for term, length in zip(meta["sparse_terms"], meta["sparse_lengths"]):
+            deltas, position = _read_array(payload, position, "I", length)
+            index._postings[term] = array("I", accumulate(deltas))
+        for term, length in zip(meta["dense_terms"], meta["dense_lengths"]):
+            index._bitmaps[term] = bytearray(payload[position:position + length])
+            position += length
+        index._deleted = bytearray(payload[position:position + meta["deleted_length"]])
+        index._deleted_count = int.from_bytes(index._deleted, "little").bit_count()
+        if position + meta["deleted_length"] != len(payload):
+            raise ValueError("payload size does not match its metadata")
+        if doc_count and max(index._doc_product) >= len(index.products):
+            raise ValueError("document refers to an unknown product")
+
+        live = index._live()
+        for doc in _iter_bits(live):
+            key = (index._doc_product[doc], index._doc_page[doc])
+            index._page_docs.setdefault(key, []).append(doc)
+        return index
+
+
+class _QueryParser:
+    """Recursive-descent parser evaluating a query straight to document bitsets.
+
+    Grammar: or := and ("OR" and)*; and := unary (["AND"] unary)*;
+    unary := ("NOT" | "-") unary | "(" or ")" | term.
+    """
+
+    def __init__(self, tokens: List[str], index: PageIndex):
+        self.tokens = tokens
+        self.position = 0
+        self.index = index
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected '{self.tokens[self.position]}'")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _or(self) -> int:
+        result = self._and()
+        while self._peek() == "OR":
+            self.position += 1
+            result |= self._and()
+        return result
+
+    def _and(self) -> int:
+        result = None
+        while True:
+            token = self._peek()
+            if token is None or token in (")", "OR"):
+                break
+            if token == "AND":
+                self.position += 1
+                continue
+            negated, operand = self._unary()
+            if negated:
+                operand = self.index._live() & ~operand
+            result = operand if result is None else result & operand
+        if result is None:
+            raise QuerySyntaxError("Expected a search term")
+        return result
+
+    def _unary(self):
+        """Returns (negated, documents)."""
+        token = self._peek()
+        if token == "NOT":
+            self.position += 1
+            if self._peek() is None:
+                raise QuerySyntaxError("NOT needs an operand")
+            negated, operand = self._unary()
+            return not negated, operand
+        if token.startswith("-") and len(token) > 1:
+            self.tokens[self.position] = token[1:]
+            negated, operand = self._unary()
+            return not negated, operand
+        if token == "(":
+            self.position += 1
+            result = self._or()
+            if self._peek() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            self.position += 1
+            return False, result
+        self.position += 1
+        return False, self._term(token)
+
+    def _term(self, token: str) -> int:
+        field, separator, value = token.partition(":")
+        if separator and field.lower() in QUERY_FIELDS:
+            return self.index._lookup(f"{field.lower()}:{value.strip(chr(34)).lower()}")
+        words = tokenize(token)
+        if not words:
+            raise QuerySyntaxError(f"Nothing searchable in '{token}'")
+        result = self.index._lookup(words[0])
+        for word in words[1:]:
+            result &= self.index._lookup(word)
+        return result
+
+
+def _set_bit(bitmap: bytearray, bit: int):
+    byte = bit >> 3
+    if byte >= len(bitmap):
+        bitmap.extend(bytes(byte + 1 - len(bitmap)))
+    bitmap[byte] |= 1 << (bit & 7)
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """Positions of the set bits, ascending."""
+    data = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+    # The regex engine skips runs of empty bytes at C speed
+    for match in _NONZERO_BYTE.finditer(data):
+        byte = data[match.start()]
+        base = match.start() << 3
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+def _strings(value) -> Iterator[str]:
+    """Every string inside a nested page structure."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _delta_encode(values: array) -> array:
+    return array("I", map(sub, values, chain((0,), values)))
+
+
+def _le_bytes(values: array) -> bytes:
+    if values.itemsize > 1 and sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(payload: memoryview, position: int, typecode: str, count: int):
+    values = array(typecode)
+    end = position + values.itemsize * count
+    values.frombytes(payload[position:end])
+    if len(values) != count:
+        raise ValueError("truncated array")
+    if values.itemsize > 1 and sys.byteorder == "big":
+        values.byteswap()
+    return values, end
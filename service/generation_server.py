@@ -0,0 +1,252 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from threading import BoundedSemaphore, Event, Lock
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+from messaging.message_types import MessagePriority
+from orchestrator.pipeline_profile import PipelineProfile, resolve_profile
+from orchestrator.workflow_orchestrator import WorkflowOrchestrator
+import hashlib
+import json
+
+
+class ServiceBusyError(Exception):
+    """Raised when the service is already at its in-flight request limit."""
+
+
+class _Flight:
+    """A single in-progress generation shared by identical concurrent requests."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[Exception] = None
+        self.waiters = 0
+
+
+class GenerationService:
+    """Warm pool of orchestrators with single-flight request coalescing.
+
+    Requests run as INTERACTIVE conversations. Given `orchestrator` (e.g.
+    one busy with a catalog run), every request is submitted to it instead
+    of a private pool, so requests share its agent queues and overtake the
+    queued BULK work; the caller keeps ownership and shuts it down.
+    """
+
+    def __init__(self, pool_size: int = 4, max_in_flight: int = 16, acquire_timeout: float = 5.0,
+                 orchestrator: WorkflowOrchestrator = None):
+        self._shared = orchestrator
+        self._pool: Queue = Queue()
+        if orchestrator is None:
+            for _ in range(pool_size):
+                self._pool.put(WorkflowOrchestrator(save_outputs=False))
+        self._orchestrators = [orchestrator] if orchestrator is not None else list(self._pool.queue)
+        self._slots = BoundedSemaphore(max_in_flight)
+        self._acquire_timeout = acquire_timeout
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = Lock()
+        self.stats = {"requests": 0, "generated": 0, "coalesced": 0, "rejected": 0, "failed": 0}
+
+    def generate(self, product: dict, profile: PipelineProfile = None) -> dict:
+        """Generate a product's pages, sharing work with identical in-flight requests.
+
+        `profile` limits generation to its pages; by default all are generated.
+        """
+        profile = resolve_profile(profile)
+        key = f"{','.join(profile.page_order)}:{self._product_key(product)}"
+
+        with self._lock:
+            self.stats["requests"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                flight.waiters += 1
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run(product, profile)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.result
+
+    def _run(self, product: dict, profile: PipelineProfile) -> dict:
+        """Run the pipeline on a pooled orchestrator within the in-flight cap."""
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise ServiceBusyError("Too many in-flight generation requests")
+
+        # A shared orchestrator takes concurrent pipelines; pooled ones run one at a time
+        orchestrator = self._shared
+        if orchestrator is None:
+            try:
+                # max_in_flight may exceed pool_size; requests beyond it wait for an orchestrator
+                orchestrator = self._pool.get(timeout=self._acquire_timeout)
+            except Empty:
+                self._slots.release()
+                with self._lock:
+                    self.stats["rejected"] += 1
+                raise ServiceBusyError("No orchestrator became free in time") from None
+
+        try:
+            result = orchestrator.run_pipeline(product, priority=MessagePriority.INTERACTIVE, profile=profile)
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        finally:
+            if self._shared is None:
+                self._pool.put(orchestrator)
+            self._slots.release()
+
+        with self._lock:
+            self.stats["generated"] += 1
+        return result
+
+    def _product_key(self, product: dict) -> str:
+        """Canonical hash of the product so equivalent payloads coalesce."""
+        canonical = json.dumps(product, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def latency_reports(self) -> list:
+        """Latency report of each pooled orchestrator."""
+        return [orchestrator.latency_report() for orchestrator in self._orchestrators]
+
+    def shutdown(self):
+        """Stop every pooled orchestrator's agents; a shared orchestrator is left to its owner."""
+        if self._shared is None:
+            for orchestrator in self._orchestrators:
+                orchestrator.shutdown()
+
+
+class GenerationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler exposing the generation service."""
+
+    protocol_version = "HTTP/1.1"
+    max_body_bytes = 1024 * 1024
+
+    def do_GET(self):
+        if self.path == "/health":
+            service = self.server.service
+            self._send_json(200, {
+                "status": "ok",
+                "stats": dict(service.stats),
+                "latency": service.latency_reports()
+            })
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/generate":
+            self._discard_body()
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        # ?profile=price_refresh or ?profile=faq_page,product_page
+        try:
+            profile = resolve_profile(parse_qs(url.query).get("profile", [None])[-1])
+        except ValueError as e:
+            self._discard_body()
+            self._send_json(400, {"error": str(e)})
+            return
+
+        length = self._content_length()
+        if length is None:
+            # The body cannot be located, so the connection cannot be reused
+            self.close_connection = True
+            self._send_json(400, {"error": "Content-Length must be a non-negative integer"})
+            return
+        if length <= 0 or length > self.max_body_bytes:
+            self._discard_body()
+            self.close_connection = True
+            self._send_json(413 if length > 0 else 400, {"error": "Request body must be 1 byte to 1 MiB of JSON"})
+            return
+
+        try:
+            product = json.loads(self.rfile.read(length))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": f"Invalid JSON: {str(e)}"})
+            return
+
+        if not isinstance(product, dict):
+            self._send_json(400, {"error": "Product must be a JSON object"})
+            return
+
+        try:
+            pages = self.server.service.generate(product, profile)
+        except ServiceBusyError as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+            return
+        except Exception as e:
+            self._send_json(422, {"error": str(e)})
+            return
+
+        self._send_json(200, pages)
+
+    def _discard_body(self):
+        """Drain an unread request body so the connection can be reused."""
+        length = self._content_length()
+        if length is None:
+            self.close_connection = True
+        elif 0 < length <= self.max_body_bytes:
+            self.rfile.read(length)
+
+    def _content_length(self) -> Optional[int]:
+        """Declared body length, 0 when absent, or None when the header is malformed."""
+        value = self.headers.get("Content-Length", "0").strip()
+        return int(value) if value.isdigit() else None
+
+    def _send_json(self, status: int, payload: dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"[GenerationServer] {self.address_string()} {format % args}")
+
+
+class GenerationServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to a warm GenerationService."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, service: GenerationService):
+        super().__init__(address, GenerationRequestHandler)
+        self.service = service
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, pool_size: int = 4, max_in_flight: int = 16,
+          orchestrator: WorkflowOrchestrator = None):
+    """Run the generation service until interrupted, on `orchestrator` if given."""
+    service = GenerationService(pool_size=pool_size, max_in_flight=max_in_flight, orchestrator=orchestrator)
+    server = GenerationServer((host, port), service)
+    print(f"[GenerationServer] Listening on http://{host}:{server.server_address[1]} (POST /generate)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[GenerationServer] Shutting down...")
+    finally:
+        server.server_close()
+        service.shutdown()
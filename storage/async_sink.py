@@ -0,0 +1,118 @@
+from collections import deque
+from threading import Condition, Thread
+from typing import Deque, List, Optional, Tuple
+from storage.output_sink import OutputSink
+
+class AsyncOutputSink(OutputSink):
+    """Moves writes of a wrapped sink onto a dedicated writer thread.
+
+    write() only appends to a bounded in-memory queue, so disk latency stays
+    off the orchestrator's coordination thread; it blocks only when
+    `max_pending` pages are already waiting. The writer drains whatever has
+    accumulated as one group and flushes the wrapped sink once per group.
+    flush() and close() wait until every page written before the call is
+    stored. A failed write or delete does not stop the rest of its group;
+    failures are collected and flush() or close() raises one error
+    reporting all of them.
+    """
+
+    def __init__(self, sink: OutputSink, max_pending: int = 1024):
+        self.sink = sink
+        self.max_pending = max_pending
+        # (product_name, page_type, page); a None page_type marks a delete
+        self._pending: Deque[Tuple[str, Optional[str], Optional[dict]]] = deque()
+        self._condition = Condition()
+        self._submitted = 0
+        self._completed = 0
+        self._closed = False
+        # (product_name, page_type or None for a delete, error) since the last flush()
+        self._failures: List[Tuple[str, Optional[str], Exception]] = []
+        self._writer = Thread(target=self._write_loop, name="output-writer", daemon=True)
+        self._writer.start()
+
+    def write(self, product_name: str, page_type: str, page: dict):
+        self._enqueue((product_name, page_type, page))
+
+    @property
+    def supports_delete(self) -> bool:
+        return self.sink.supports_delete
+
+    def delete(self, product_name: str):
+        if not self.sink.supports_delete:
+            # Fail in the caller rather than later on the writer thread
+            self.sink.delete(product_name)
+        # Queued like a write so it applies after the product's earlier pages
+        self._enqueue((product_name, None, None))
+
+    def _enqueue(self, item: Tuple[str, Optional[str], Optional[dict]]):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Output sink is closed")
+            while len(self._pending) >= self.max_pending:
+                self._condition.wait()
+            self._pending.append(item)
+            self._submitted += 1
+            self._condition.notify_all()
+
+    def flush(self):
+        """Block until all pages written so far are stored by the wrapped sink."""
+        with self._condition:
+            target = self._submitted
+            while self._completed < target and self._writer.is_alive():
+                self._condition.wait()
+            self._raise_error()
+
+    def close(self):
+        """Drain outstanding writes, stop the writer thread and close the wrapped sink."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self.sink.close()
+        with self._condition:
+            self._raise_error()
+
+    def _raise_error(self):
+        if not self._failures:
+            return
+        failures, self._failures = self._failures, []
+        details = "; ".join(
+            f"{'delete' if page_type is None else page_type} of {product_name!r}: {error}"
+            for product_name, page_type, error in failures[:5]
+        )
+        more = f" (and {len(failures) - 5} more)" if len(failures) > 5 else ""
+        raise RuntimeError(f"{len(failures)} background output write(s) failed: {details}{more}") from failures[0][2]
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                group = list(self._pending)
+                self._pending.clear()
+                # Room in the queue again for blocked writers
+                self._condition.notify_all()
+
+            failures = []
+            for product_name, page_type, page in group:
+                # One bad page must not cost the other products in the group their output
+                try:
+                    if page_type is None:
+                        self.sink.delete(product_name)
+                    else:
+                        self.sink.write(product_name, page_type, page)
+                except Exception as e:
+                    failures.append((product_name, page_type, e))
+            try:
+                self.sink.flush()
+            except Exception as e:
+                failures.append(("<group>", "flush", e))
+
+            with self._condition:
+                self._failures.extend(failures)
+                self._completed += len(group)
+                self._condition.notify_all()
@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+
+def _current_umask() -> int:
+    # The umask can only be read by setting it; this runs once at import
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# mkstemp creates 0600 files; published pages get the usual umask-derived mode
+PAGE_FILE_MODE = 0o666 & ~_current_umask()
+
+class OutputSink(ABC):
+    """Destination for generated pages, keyed by product and page type.
+
+    Deleting is an optional capability, like seeking on io streams: check
+    supports_delete before relying on delete().
+    """
+
+    # Whether delete() can remove a product's pages from this sink
+    supports_delete = False
+
+    @abstractmethod
+    def write(self, product_name: str, page_type: str, page: dict):
+        """Store one generated page, replacing any earlier version."""
+        pass
+
+    def delete(self, product_name: str):
+        """Remove every stored page of a product; only sinks with supports_delete implement it."""
+        raise io.UnsupportedOperation(f"{type(self).__name__} cannot delete pages")
+
+    def flush(self):
+        """Persist any buffered pages."""
+        pass
+
+    def close(self):
+        """Flush and release resources."""
+        self.flush()
+
+
+class FileOutputSink(OutputSink):
+    """Writes each page as a pretty-printed JSON file.
+
+    With per_product=False pages go to `<output_dir>/<page_type>.json`, so
+    a later product overwrites an earlier one; with per_product=True each
+    product gets its own `<output_dir>/<slug>-<hash>/` directory, where the
+    hash of the exact name keeps "Foo Serum" and "foo-serum" apart. Files are
+    written to a temporary file, fsynced and renamed into place, so readers
+    never see a partially written page, even after a crash.
+    """
+
+    def __init__(self, output_dir: str = "output", per_product: bool = False):
+        self.output_dir = output_dir
+        self.per_product = per_product
+
+    @property
+    def supports_delete(self) -> bool:
+        # Flat files hold whichever product was written last, so they cannot be attributed to a product
+        return self.per_product
+
+    def write(self, product_name: str, page_type: str, page: dict):
+        directory = self.output_dir
+        if self.per_product:
+            directory = os.path.join(directory, self._slug(product_name))
+        os.makedirs(directory, exist_ok=True)
+
+        filepath = os.path.join(directory, f"{page_type}.json")
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{page_type}.", suffix=".tmp")
+        try:
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump(page, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(temp_path, PAGE_FILE_MODE)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        print(f"  ✓ Saved: {filepath}")
+
+    def delete(self, product_name: str):
+        if not self.per_product:
+            raise io.UnsupportedOperation("Pages can only be deleted with per_product=True")
+        directory = os.path.join(self.output_dir, self._slug(product_name))
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+            print(f"  ✓ Removed: {directory}")
+
+    def _slug(self, product_name: str) -> str:
+        """Filesystem-safe directory name for a product, unique per exact name."""
+        # The readable part is lossy (case, punctuation, non-ASCII); the hash is not
+        readable = re.sub(r"[^a-z0-9]+", "-", product_name.lower()).strip("-")[:64].rstrip("-") or "product"
+        digest = hashlib.sha1(product_name.encode("utf-8")).hexdigest()[:8]
+        return f"{readable}-{digest}"
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import List, Optional
+from storage.output_sink import OutputSink
+import json
+import sqlite3
+
+class SQLiteOutputSink(OutputSink):
+    """Stores pages in one SQLite table keyed by (product_name, page_type).
+
+    Writes are buffered and applied with executemany in one transaction per
+    `batch_size` pages. The database runs in WAL mode, and regenerating a
+    page upserts the existing row.
+    """
+
+    supports_delete = True
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                product_name TEXT NOT NULL,
+                page_type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                generated_at TEXT NOT NULL,
+                PRIMARY KEY (product_name, page_type)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def write(self, product_name: str, page_type: str, page: dict):
+        self._pending.append((
+            product_name,
+            page_type,
+            json.dumps(page, ensure_ascii=False, separators=(",", ":")),
+            datetime.now().isoformat()
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered pages in a single transaction."""
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                """
+                INSERT INTO pages (product_name, page_type, content, generated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (product_name, page_type) DO UPDATE SET
+                    content = excluded.content,
+                    generated_at = excluded.generated_at
+                """,
+                self._pending
+            )
+        print(f"  ✓ Saved {len(self._pending)} page(s) to {self.path}")
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def delete(self, product_name: str):
+        self.flush()
+        with self._connection:
+            self._connection.execute("DELETE FROM pages WHERE product_name = ?", (product_name,))
+        print(f"  ✓ Removed pages of {product_name} from {self.path}")
+
+    def merge(self, path: str):
+        """Upsert every page from another page database (e.g. a worker shard) into this one."""
+        self.flush()
+        self._connection.execute("ATTACH DATABASE ? AS shard", (path,))
+        try:
+            with self._connection:
+                # WHERE true lets SQLite parse the upsert clause after a SELECT
+                self._connection.execute(
+                    """
+                    INSERT INTO pages (product_name, page_type, content, generated_at)
+                    SELECT product_name, page_type, content, generated_at FROM shard.pages WHERE true
+                    ON CONFLICT (product_name, page_type) DO UPDATE SET
+                        content = excluded.content,
+                        generated_at = excluded.generated_at
+                    """
+                )
+        finally:
+            self._connection.execute("DETACH DATABASE shard")
+
+    def get_page(self, product_name: str, page_type: str) -> Optional[dict]:
+        """Return a stored page, or None if it has not been generated."""
+        self.flush()
+        row = self._connection.execute(
+            "SELECT content FROM pages WHERE product_name = ? AND page_type = ?",
+            (product_name, page_type)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def product_names(self) -> List[str]:
+        """Names of all products with at least one stored page."""
+        self.flush()
+        rows = self._connection.execute("SELECT DISTINCT product_name FROM pages ORDER BY product_name")
+        return [row[0] for row in rows]